@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'notifications',
     'tenders',
     'budgets',
+    'uploads',
 ]
 
 MIDDLEWARE = [
@@ -101,9 +102,75 @@ DATABASES = {
 LOGIN_URL = '/users/login/'
 FRONTEND_URL = 'http://192.168.100.144:5173'
 
+# Tender search backend: 'mysql' (FULLTEXT) or 'memory' (in-process inverted index, for SQLite/tests).
+# Left unset, it follows the default database vendor.
+TENDER_SEARCH_BACKEND = None
+TENDER_SEARCH_MAX_RESULTS = 500
+
+# Tender reference numbers reserved per sequence-row lock when allocating outside a transaction
+TENDER_REFERENCE_BLOCK_SIZE = 20
+
+# Seconds a tender's upload requirement map stays cached (tenders.requirements); changes invalidate it.
+# The alias must be shared by all workers, or invalidation only reaches the one that made the change.
+TENDER_REQUIREMENTS_CACHE_ALIAS = 'tender_requirements'
+TENDER_REQUIREMENTS_CACHE_TIMEOUT = 3600
+
+# Status published tenders move to at closing_date (run_tender_scheduler), and tenders per transaction
+TENDER_CLOSE_STATUS = 'evaluation'
+TENDER_CLOSE_BATCH_SIZE = 200
+
+# Bid submission: 'sync' finalizes in the request; 'queued' logs the arrival time, answers 202 and
+# leaves validation to the process_bid_submissions worker pool (bids.intake)
+BID_SUBMISSION_MODE = 'sync'
+BID_SUBMISSION_WORKERS = 4
+BID_SUBMISSION_BATCH_SIZE = 100
+BID_SUBMISSION_RECLAIM_SECONDS = 300  # retry entries a failed or crashed worker left 'processing'
+
+# Default tie breakers after total_score when ranking bids (bids.services): 'lowest_price',
+# 'earliest_submission'; an empty list ranks equal scores equally
+BID_RANKING_TIE_BREAKERS = ['lowest_price', 'earliest_submission']
+
+# Caches that several worker processes must agree on (the public tender feed and its invalidation
+# generation, upload requirements) use a shared backend. The file based one below is shared by every
+# process on the host; with more than one application server switch these aliases to Redis, e.g.
+#   {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'}
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tender_requirements': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'tender_requirements'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'public_tenders': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'public_tenders'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+PUBLIC_TENDER_CACHE_ALIAS = 'public_tenders'
+PUBLIC_TENDER_CACHE_TIMEOUT = 300  # seconds; entries also expire at the next relevant closing_date
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resumable chunked uploads (uploads app). Keep the directory on the same filesystem as MEDIA_ROOT
+# so completed files are moved into place with a rename.
+CHUNKED_UPLOAD_DIR = os.path.join(MEDIA_ROOT, '.chunked')
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Bid and tender documents are stored once per content hash (uploads.storage); unreferenced blobs
+# are removed by collect_document_blobs after this many hours
+DOCUMENT_BLOB_GC_GRACE_HOURS = 24
+
+# How authorized document downloads are delivered (uploads.serving): 'django' (Range-aware FileResponse),
+# 'nginx' (X-Accel-Redirect to an internal location aliasing MEDIA_ROOT) or 'sendfile' (X-Sendfile)
+DOCUMENT_SERVE_MODE = 'django'
+DOCUMENT_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'  # Example using Gmail
@@ -23,4 +23,5 @@ urlpatterns = [
     path('tenders/', include('tenders.urls')),
     # Mount bids endpoints under /bids/
     path('bids/', include('bids.urls')),
+    path('uploads/', include('uploads.urls')),
 ]
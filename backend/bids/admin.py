@@ -14,4 +14,5 @@ admin.site.register(Contract)
 admin.site.register(ContractMilestone)
 admin.site.register(EvaluationCriterion)
 admin.site.register(TenderEvaluationConfig)
+admin.site.register(BidSubmissionIntake)
 
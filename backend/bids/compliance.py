@@ -0,0 +1,33 @@
+"""
+Mandatory-upload compliance of bids.
+
+``missing_required_uploads`` answers "which mandatory uploads are missing" for any number of bids
+with one anti-join: each bid joined to its tender's mandatory TenderUploadDocuments, keeping the
+pairs with no BidDocument of that document_type.
+"""
+from django.db.models import Exists, OuterRef
+
+from .models import Bid, BidDocument
+
+
+def requirement_label(name: str, file_type: str) -> str:
+    return f"{name} ({file_type})"
+
+
+def missing_required_uploads(bids) -> dict:
+    """Map bid id -> labels of the mandatory uploads it lacks, for ``bids`` (ids or a Bid queryset).
+
+    Bids that are complete are absent from the result.
+    """
+    has_upload = BidDocument.objects.filter(
+        bid=OuterRef('pk'), document_type=OuterRef('tender__upload_documents__file_type'))
+    rows = (
+        Bid.objects
+        .filter(~Exists(has_upload), id__in=bids, tender__upload_documents__mandatory=True)
+        .order_by('id', 'tender__upload_documents__id')
+        .values_list('id', 'tender__upload_documents__name', 'tender__upload_documents__file_type')
+    )
+    missing = {}
+    for bid_id, name, file_type in rows:
+        missing.setdefault(bid_id, []).append(requirement_label(name, file_type))
+    return missing
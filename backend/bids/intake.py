@@ -0,0 +1,176 @@
+"""
+Queued bid submission for the rush before a closing date.
+
+With ``settings.BID_SUBMISSION_MODE = 'queued'`` SubmitBidView only does the cheap checks
+(ownership, state, deadline against the arrival time), appends a BidSubmissionIntake row
+carrying the server receive time and answers 202. The ``process_bid_submissions`` worker claims
+pending entries oldest first and finalizes them on a thread pool. Finalizing locks the bid and
+submits it only if it is still a draft (a bid withdrawn meanwhile is rejected), after the
+required-uploads check. ``submitted_at`` is set to the receive time, so a bid that arrived before
+the deadline stays on time however long the queue is. The supplier is notified of the outcome
+and can poll the bid's submission status.
+
+Entries left 'processing' by a failed attempt or a crashed worker are claimed again after
+``BID_SUBMISSION_RECLAIM_SECONDS``; after ``MAX_ATTEMPTS`` failures an entry is rejected.
+"""
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from .models import Bid, BidSubmissionIntake
+from .serializer import ensure_bid_has_required_uploads
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('pending', 'processing')
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_RECLAIM_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+
+def submission_mode() -> str:
+    mode = getattr(settings, 'BID_SUBMISSION_MODE', 'sync')
+    if mode not in ('sync', 'queued'):
+        raise ValueError("BID_SUBMISSION_MODE must be 'sync' or 'queued'")
+    return mode
+
+
+def intake_payload(entry: BidSubmissionIntake) -> dict:
+    return {
+        'intake_id': entry.id,
+        'bid_id': str(entry.bid_id),
+        'status': entry.status,
+        'received_at': entry.received_at,
+        'processed_at': entry.processed_at,
+        **entry.result,
+    }
+
+
+def record_submission(bid: Bid, user, received_at=None) -> tuple[BidSubmissionIntake, bool]:
+    """Log a submission of ``bid``; a bid already waiting in the queue keeps its first entry."""
+    received_at = received_at or now()
+    with transaction.atomic():
+        # Serializes double clicks on the same bid; other bids are not blocked
+        Bid.objects.select_for_update().filter(pk=bid.pk).values_list('pk', flat=True).first()
+        entry = BidSubmissionIntake.objects.filter(bid=bid, status__in=OPEN_STATUSES).first()
+        if entry is not None:
+            return entry, False
+        return BidSubmissionIntake.objects.create(bid=bid, submitted_by=user, received_at=received_at), True
+
+
+def claim_batch(batch_size: int = None) -> list[int]:
+    """Mark up to ``batch_size`` of the oldest waiting entries as processing and return their ids."""
+    batch_size = batch_size or getattr(settings, 'BID_SUBMISSION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    stale = now() - timedelta(seconds=getattr(settings, 'BID_SUBMISSION_RECLAIM_SECONDS', DEFAULT_RECLAIM_SECONDS))
+    with transaction.atomic():
+        # Concurrent workers skip each other's rows instead of waiting on them
+        qs = (BidSubmissionIntake.objects
+              .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+              .filter(Q(status='pending') | Q(status='processing', claimed_at__lt=stale))
+              .order_by('received_at', 'id'))
+        ids = list(qs.values_list('id', flat=True)[:batch_size])
+        if ids:
+            BidSubmissionIntake.objects.filter(id__in=ids).update(
+                status='processing', claimed_at=now(), attempts=F('attempts') + 1)
+    return ids
+
+
+def _notify(entry: BidSubmissionIntake, bid: Bid):
+    from notifications.models import Notification
+
+    if entry.status == 'accepted':
+        title = f"Bid {bid.bid_reference} submitted"
+        message = (f"Your bid for {bid.tender.reference_number} was received at "
+                   f"{entry.received_at:%Y-%m-%d %H:%M:%S} and is now submitted.")
+    else:
+        title = f"Bid {bid.bid_reference} was not submitted"
+        message = entry.result.get('error', 'The submission was rejected.')
+        if entry.result.get('missing_documents'):
+            message += ': ' + ', '.join(entry.result['missing_documents'])
+    Notification.objects.create(
+        user_id=bid.supplier_id,
+        title=title,
+        message=message,
+        notification_type='bid_submitted',
+        related_id=bid.id,
+        related_type='bid',
+        priority='medium' if entry.status == 'accepted' else 'high',
+    )
+
+
+def finalize_submission(entry_id: int) -> str:
+    """Validate and submit the bid behind a claimed entry. Returns the entry's resulting status."""
+    with transaction.atomic():
+        entry = BidSubmissionIntake.objects.select_for_update().filter(pk=entry_id).first()
+        if entry is None or entry.status != 'processing':
+            return entry.status if entry else 'missing'
+        bid = Bid.objects.select_for_update().select_related('tender').get(pk=entry.bid_id)
+
+        if bid.status == 'submitted':
+            entry.status = 'accepted'
+        elif bid.status != 'draft':
+            # Withdrawn (or otherwise moved on) while the submission waited in the queue
+            entry.status = 'rejected'
+            entry.result = {'error': f'Bid is {bid.status} and can no longer be submitted'}
+        else:
+            ok, missing = ensure_bid_has_required_uploads(bid)
+            if ok:
+                bid.status = 'submitted'
+                bid.submitted_at = entry.received_at
+                bid.save(update_fields=['status', 'submitted_at', 'updated_at'])
+                entry.status = 'accepted'
+            else:
+                entry.status = 'rejected'
+                entry.result = {'error': 'Missing mandatory documents', 'missing_documents': missing}
+        entry.processed_at = now()
+        entry.save(update_fields=['status', 'result', 'processed_at'])
+        _notify(entry, bid)
+    return entry.status
+
+
+def _record_failure(entry_id: int):
+    """After a failure the entry stays 'processing' and is retried once it can be reclaimed, which
+    spaces the attempts out; the last allowed attempt rejects it."""
+    entry = BidSubmissionIntake.objects.filter(pk=entry_id, status='processing').first()
+    if entry is not None and entry.attempts >= MAX_ATTEMPTS:
+        entry.status = 'rejected'
+        entry.result = {'error': 'The submission could not be processed. Please submit again.'}
+        entry.processed_at = now()
+        entry.save(update_fields=['status', 'result', 'processed_at'])
+
+
+def _process_chunk(ids: list[int]) -> Counter:
+    outcomes = Counter()
+    try:
+        for entry_id in ids:
+            try:
+                outcomes[finalize_submission(entry_id)] += 1
+            except Exception:
+                logger.exception("Could not finalize bid submission intake %s", entry_id)
+                _record_failure(entry_id)
+                outcomes['failed'] += 1
+    finally:
+        # Each pool thread has its own connection; do not leak it
+        connection.close()
+    return outcomes
+
+
+def process_pending_submissions(workers: int = None, batch_size: int = None) -> Counter:
+    """Finalize everything waiting in the intake log. Returns a count per outcome."""
+    workers = max(workers or getattr(settings, 'BID_SUBMISSION_WORKERS', DEFAULT_WORKERS), 1)
+    totals = Counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bid-intake') as pool:
+        while True:
+            ids = claim_batch(batch_size)
+            if not ids:
+                return totals
+            chunks = [ids[i::workers] for i in range(workers) if ids[i::workers]]
+            for outcomes in pool.map(_process_chunk, chunks):
+                totals.update(outcomes)
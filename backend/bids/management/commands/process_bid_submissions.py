@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bids.intake import process_pending_submissions
+
+
+class Command(BaseCommand):
+    help = ("Finalize bid submissions queued by SubmitBidView (BID_SUBMISSION_MODE='queued'). "
+            "Runs as a long-lived worker unless --once is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue and exit (for cron).")
+        parser.add_argument('--workers', type=int, help="Threads finalizing submissions in parallel.")
+        parser.add_argument('--batch-size', type=int, help="Entries claimed per round.")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty (default 1).")
+
+    def handle(self, *args, **options):
+        if not options['once']:
+            self.stdout.write(self.style.SUCCESS("Bid submission worker running."))
+        try:
+            while True:
+                close_old_connections()
+                outcomes = process_pending_submissions(workers=options.get('workers'),
+                                                       batch_size=options.get('batch_size'))
+                if outcomes:
+                    self.stdout.write(', '.join(f"{n} {status}" for status, n in sorted(outcomes.items())))
+                if options['once']:
+                    return
+                if not outcomes:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Bid submission worker stopped.")
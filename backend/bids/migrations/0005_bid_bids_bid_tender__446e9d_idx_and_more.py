@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bids', '0004_alter_biddocument_document_type'),
+        ('tenders', '0012_tender_tenders_ten_status_9589ca_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['tender', 'status'], name='bids_bid_tender__446e9d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['supplier', '-created_at'], name='bids_bid_supplie_8dafcc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biddocument',
+            index=models.Index(fields=['bid', 'document_type'], name='bids_biddoc_bid_id_8eb317_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:22
+
+import bids.models
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bids', '0005_bid_bids_bid_tender__446e9d_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='biddocument',
+            name='file',
+            field=models.FileField(storage=uploads.storage.get_document_storage, upload_to=bids.models.bid_document_path),
+        ),
+    ]
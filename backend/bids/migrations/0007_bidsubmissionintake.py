@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bids', '0006_alter_biddocument_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BidSubmissionIntake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('received_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], default='pending', max_length=12)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('bid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_intakes', to='bids.bid')),
+                ('submitted_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bid_submission_intakes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['received_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'received_at'], name='bids_bidsub_status_0cfab6_idx')],
+            },
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.db import models
 
 from users.models import  ProcuringEntity
 from tenders.models import Tender
+from uploads.storage import get_document_storage
 
 from django.conf import settings
 # Create your models here.
@@ -77,6 +78,11 @@ class Bid(models.Model):
     class Meta:
         unique_together = ['tender', 'supplier']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tender', 'status']),
+            # A supplier's bids, newest first (MyBidsListView)
+            models.Index(fields=['supplier', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.bid_reference} - {self.tender.reference_number}"
@@ -126,16 +132,56 @@ class BidDocument(models.Model):
     document_name = models.CharField(max_length=200)
     # Allow arbitrary types to align with TenderUploadDocuments.file_type
     document_type = models.CharField(max_length=200)
-    file = models.FileField(upload_to=bid_document_path)
+    file = models.FileField(upload_to=bid_document_path, storage=get_document_storage)
     file_size = models.PositiveBigIntegerField(null=True, blank=True)
     mime_type = models.CharField(max_length=100, blank=True)
     is_required = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['bid', 'document_type']),
+        ]
+
     def __str__(self):
         return f"{self.bid.bid_reference} - {self.document_name}"
 
 
+class BidSubmissionIntake(models.Model):
+    """Append-only log of bid submissions accepted for asynchronous finalization (bids.intake).
+
+    ``received_at`` is the server time the submission arrived and is what the closing date is judged
+    against; it is never changed. Workers only fill in the processing fields.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('accepted', 'Accepted'),
+        ('rejected', 'Rejected'),
+    ]
+
+    bid = models.ForeignKey(Bid, on_delete=models.CASCADE, related_name='submission_intakes')
+    submitted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                     related_name='bid_submission_intakes')
+    received_at = models.DateTimeField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Rejection details, e.g. {'error': ..., 'missing_documents': [...]}
+    result = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['received_at', 'id']
+        indexes = [
+            # Workers claim the oldest pending entries first
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.bid.bid_reference} received {self.received_at:%Y-%m-%d %H:%M:%S} ({self.status})"
+
+
 class EvaluationCommittee(models.Model):
     """Committees responsible for evaluating bids"""
     STATUS_CHOICES = [
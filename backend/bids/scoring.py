@@ -0,0 +1,129 @@
+"""
+Tender-wide evaluation scoring.
+
+``recompute_tender_scores`` recomputes the compliance flag and the technical, financial and overall
+scores of every BidEvaluation of a tender (or the given subset). It runs the same reads however
+many bids and evaluators there are (the evaluation config, the criteria, the evaluations with their
+bid price, all criterion scores, the lowest bid price), then bulk_updates only the rows whose
+results changed, ``WRITE_BATCH_SIZE`` per UPDATE.
+
+Each criterion's weight / max_points factor is computed once. The score rows are then folded into
+per-evaluation accumulators in a single pass, so no per-evaluation queries or re-filtering are
+needed. Arithmetic stays in Decimal; results are rounded once to the two places the score fields
+store, half to even, which is what saving an unrounded Decimal did before (62.525 -> 62.52).
+"""
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from django.db import transaction
+from django.db.models import F, Min
+
+from .models import Bid, BidCriterionScore, BidEvaluation, EvaluationCriterion, TenderEvaluationConfig
+
+SCORE_PLACES = Decimal('0.01')
+HUNDRED = Decimal('100')
+ZERO = Decimal('0')
+SCORE_FIELDS = ('technical_compliance', 'technical_score', 'financial_score', 'overall_score')
+WRITE_BATCH_SIZE = 100
+
+
+class ScoringConfigError(ValueError):
+    pass
+
+
+def _quantize(value: Decimal) -> Decimal:
+    return value.quantize(SCORE_PLACES, rounding=ROUND_HALF_EVEN)
+
+
+def _criteria_factors(tender) -> dict:
+    """criterion id -> (section, mandatory, weight, weight / max_points); factor is None when ignored."""
+    out = {}
+    rows = EvaluationCriterion.objects.filter(tender=tender).values_list(
+        'id', 'section', 'mandatory', 'weight', 'max_points')
+    for cid, section, mandatory, weight, max_points in rows:
+        weight = weight or Decimal('1')
+        factor = (weight / max_points) if max_points else None
+        out[cid] = (section, mandatory, weight, factor)
+    return out
+
+
+def _lowest_price_score(price, lowest) -> Decimal:
+    if not lowest or not price:
+        return ZERO
+    return (lowest / price) * HUNDRED
+
+
+def recompute_tender_scores(tender, evaluation_ids=None) -> list[BidEvaluation]:
+    """Recompute and save the scores of the tender's evaluations; returns the updated evaluations."""
+    cfg = TenderEvaluationConfig.objects.filter(tender=tender).first()
+    if cfg is None:
+        raise ScoringConfigError("Tender evaluation config is not set.")
+    criteria = _criteria_factors(tender)
+
+    evaluations = BidEvaluation.objects.filter(bid__tender=tender).annotate(bid_price=F('bid__total_bid_amount'))
+    scores = BidCriterionScore.objects.filter(evaluation__bid__tender=tender)
+    if evaluation_ids is not None:
+        evaluations = evaluations.filter(pk__in=evaluation_ids)
+        scores = scores.filter(evaluation_id__in=evaluation_ids)
+    evaluations = list(evaluations)
+    if not evaluations:
+        return []
+    stored = {ev.pk: tuple(getattr(ev, f) for f in SCORE_FIELDS) for ev in evaluations}
+
+    # Accumulators per evaluation: compliance ok, technical sum/weight, financial sum/weight
+    acc = {ev.pk: [True, ZERO, ZERO, ZERO, ZERO] for ev in evaluations}
+    enforce_mandatory = cfg.enforce_mandatory
+    for evaluation_id, criterion_id, score in scores.values_list('evaluation_id', 'criterion_id', 'score'):
+        crit = criteria.get(criterion_id)
+        row = acc.get(evaluation_id)
+        if crit is None or row is None:
+            continue
+        section, mandatory, weight, factor = crit
+        if section == 'compliance':
+            # For upload/boolean: score > 0 means pass
+            if enforce_mandatory and mandatory and not score > 0:
+                row[0] = False
+        elif factor is not None and section in ('technical', 'financial'):
+            i = 1 if section == 'technical' else 3
+            row[i] += score * factor
+            row[i + 1] += weight
+
+    lowest = None
+    if cfg.financial_method == TenderEvaluationConfig.FIN_METHOD_LOWEST_PRICE:
+        lowest = Bid.objects.filter(tender=tender).aggregate(m=Min('total_bid_amount'))['m']
+
+    pass_mark = cfg.technical_pass_mark
+    cap = cfg.cap_financial_score_at
+    tw = Decimal(cfg.technical_weight or 0)
+    fw = Decimal(cfg.financial_weight or 0)
+    denom = tw + fw if (tw + fw) != 0 else Decimal('1')
+
+    for ev in evaluations:
+        compliant, tech_sum, tech_weight, fin_sum, fin_weight = acc[ev.pk]
+        technical = (tech_sum / tech_weight) * HUNDRED if tech_weight else ZERO
+        if pass_mark is not None and technical < pass_mark:
+            compliant = False
+        if cfg.financial_method == TenderEvaluationConfig.FIN_METHOD_LOWEST_PRICE:
+            financial = _lowest_price_score(ev.bid_price, lowest)
+        else:
+            financial = (fin_sum / fin_weight) * HUNDRED if fin_weight else ZERO
+        if cap:
+            financial = min(financial, cap)
+        overall = (technical * tw + financial * fw) / denom
+        if cfg.compliance_required and not compliant:
+            overall = ZERO
+
+        ev.technical_compliance = compliant
+        ev.technical_score = _quantize(technical)
+        ev.financial_score = _quantize(financial)
+        ev.overall_score = _quantize(overall)
+
+    _write_scores([ev for ev in evaluations if stored[ev.pk] != tuple(getattr(ev, f) for f in SCORE_FIELDS)])
+    return evaluations
+
+
+def _write_scores(evaluations):
+    """Save the changed rows with bulk_update: one UPDATE per batch, each field set through a CASE on the
+    primary key. That SQL grows with the batch, so batches are kept moderate."""
+    if evaluations:
+        with transaction.atomic():
+            BidEvaluation.objects.bulk_update(evaluations, SCORE_FIELDS, batch_size=WRITE_BATCH_SIZE)
@@ -1,7 +1,16 @@
+import math
+from collections import Counter
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connection, transaction
 from rest_framework import serializers
 from .models import Bid, BidItem, BidDocument, EvaluationCriterion, BidCriterionScore, BidEvaluation, \
     TenderEvaluationConfig
 from tenders.models import Tender
+from .compliance import missing_required_uploads
+from .scoring import recompute_tender_scores, ScoringConfigError
+
+CENT = Decimal('0.01')
 
 
 class BidItemSerializer(serializers.ModelSerializer):
@@ -16,6 +25,65 @@ class BidItemSerializer(serializers.ModelSerializer):
         fields = ['itemNumber', 'description', 'quantity', 'unitOfMeasure', 'unitPrice', 'totalPrice', 'specifications', 'brand', 'model', 'countryOfOrigin']
 
 
+BID_ITEM_FIELDS = [
+    'description', 'quantity', 'unit_of_measure', 'unit_price', 'total_price',
+    'specifications', 'brand', 'model', 'country_of_origin',
+]
+
+
+def _bid_item_values(item) -> dict:
+    quantity = Decimal(str(item.get('quantity') or 0))
+    unit_price = Decimal(str(item.get('unit_price') or item.get('unitPrice') or 0))
+    return {
+        'description': item.get('description', ''),
+        'quantity': quantity.quantize(CENT),
+        'unit_of_measure': item.get('unit_of_measure') or item.get('unitOfMeasure') or '',
+        'unit_price': unit_price.quantize(CENT),
+        # Same rule as BidItem.save, which bulk writes bypass
+        'total_price': (quantity * unit_price).quantize(CENT, rounding=ROUND_HALF_UP),
+        'specifications': item.get('specifications', ''),
+        'brand': item.get('brand', ''),
+        'model': item.get('model', ''),
+        'country_of_origin': item.get('country_of_origin') or item.get('countryOfOrigin') or '',
+    }
+
+
+def sync_bid_items(bid: Bid, items_data) -> None:
+    """Make the bid's items match ``items_data``, keyed on item_number.
+
+    New lines are bulk inserted, changed lines bulk updated and lines no longer sent deleted in one
+    statement; unchanged lines are not written at all.
+    """
+    existing = {}
+    stale = []
+    for row in bid.items.all():
+        if row.item_number in existing:
+            stale.append(row.pk)  # duplicate numbers left by the old delete-and-recreate saves
+        else:
+            existing[row.item_number] = row
+
+    to_create, to_update = [], []
+    for idx, item in enumerate(items_data, start=1):
+        number = item.get('item_number') or item.get('itemNumber') or idx
+        values = _bid_item_values(item)
+        row = existing.pop(number, None)
+        if row is None:
+            to_create.append(BidItem(bid=bid, item_number=number, **values))
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            to_update.append(row)
+    stale.extend(row.pk for row in existing.values())
+
+    with transaction.atomic():
+        if stale:
+            BidItem.objects.filter(pk__in=stale).delete()
+        if to_update:
+            BidItem.objects.bulk_update(to_update, BID_ITEM_FIELDS, batch_size=500)
+        if to_create:
+            BidItem.objects.bulk_create(to_create, batch_size=500)
+
+
 class BidCreateSerializer(serializers.ModelSerializer):
     items = BidItemSerializer(many=True, required=False)
     tender = serializers.PrimaryKeyRelatedField(queryset=Tender.objects.all())
@@ -28,6 +96,14 @@ class BidCreateSerializer(serializers.ModelSerializer):
             'technical_proposal', 'methodology', 'project_timeline', 'status', 'items'
         ]
 
+    def validate_items(self, items):
+        # Items are matched to stored rows by item_number, so it must identify one line
+        counts = Counter(item.get('item_number') for item in items if item.get('item_number'))
+        duplicates = sorted(n for n, c in counts.items() if c > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate itemNumber: {duplicates}")
+        return items
+
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
         request = self.context.get('request')
@@ -38,21 +114,7 @@ class BidCreateSerializer(serializers.ModelSerializer):
         )
         # Replace items when provided
         if items_data:
-            bid.items.all().delete()
-            for idx, item in enumerate(items_data, start=1):
-                BidItem.objects.create(
-                    bid=bid,
-                    item_number=item.get('item_number') or item.get('itemNumber') or idx,
-                    description=item.get('description', ''),
-                    quantity=item.get('quantity', 0),
-                    unit_of_measure=item.get('unit_of_measure') or item.get('unitOfMeasure') or '',
-                    unit_price=item.get('unit_price') or item.get('unitPrice') or 0,
-                    total_price=item.get('total_price') or item.get('totalPrice') or 0,
-                    specifications=item.get('specifications', ''),
-                    brand=item.get('brand', ''),
-                    model=item.get('model', ''),
-                    country_of_origin=item.get('country_of_origin') or item.get('countryOfOrigin') or ''
-                )
+            sync_bid_items(bid, items_data)
         return bid
 
     def update(self, instance, validated_data):
@@ -68,21 +130,7 @@ class BidCreateSerializer(serializers.ModelSerializer):
         instance.save()
         # Optionally replace items when provided
         if items_data is not None:
-            instance.items.all().delete()
-            for idx, item in enumerate(items_data, start=1):
-                BidItem.objects.create(
-                    bid=instance,
-                    item_number=item.get('item_number') or item.get('itemNumber') or idx,
-                    description=item.get('description', ''),
-                    quantity=item.get('quantity', 0),
-                    unit_of_measure=item.get('unit_of_measure') or item.get('unitOfMeasure') or '',
-                    unit_price=item.get('unit_price') or item.get('unitPrice') or 0,
-                    total_price=item.get('total_price') or item.get('totalPrice') or 0,
-                    specifications=item.get('specifications', ''),
-                    brand=item.get('brand', ''),
-                    model=item.get('model', ''),
-                    country_of_origin=item.get('country_of_origin') or item.get('countryOfOrigin') or ''
-                )
+            sync_bid_items(instance, items_data)
         return instance
 
 class TenderEvaluationConfigSerializer(serializers.ModelSerializer):
@@ -127,31 +175,43 @@ class UpsertBidCriterionScoresSerializer(serializers.Serializer):
         criterion_ids = [it.get('criterion') for it in attrs['items']]
         if not all(criterion_ids):
             raise serializers.ValidationError("Each item must include 'criterion'.")
-        existing = set(EvaluationCriterion.objects.filter(id__in=criterion_ids, tender_id=tender_id).values_list('id', flat=True))
-        missing = [cid for cid in criterion_ids if cid not in existing]
+        try:
+            criterion_ids = [int(cid) for cid in criterion_ids]
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("'criterion' must be a criterion id.")
+        # Loaded once here and reused by save()
+        self._criteria = {
+            c.id: c for c in EvaluationCriterion.objects.filter(id__in=criterion_ids, tender_id=tender_id)
+            .select_related('expected_upload')
+        }
+        missing = [cid for cid in criterion_ids if cid not in self._criteria]
         if missing:
             raise serializers.ValidationError(f"Invalid criterion for this tender: {missing}")
         return attrs
 
     def save(self, **kwargs):
-        from django.db import transaction
         evaluation: BidEvaluation = self.context['evaluation']
         items = self.validated_data['items']
+        criteria = self._criteria
+        present_types = set()
+        if any(c.criterion_type == EvaluationCriterion.TYPE_UPLOAD and c.expected_upload_id for c in criteria.values()):
+            present_types = set(
+                BidDocument.objects.filter(bid_id=evaluation.bid_id).values_list('document_type', flat=True))
 
         def coerce_score(criterion: EvaluationCriterion, payload: dict) -> tuple[float, str]:
             ctype = criterion.criterion_type
-            comments = payload.get('comments', '')
+            comments = payload.get('comments') or ''
             if ctype == EvaluationCriterion.TYPE_UPLOAD:
                 # Auto-score based on presence of required document aligned with tender's upload definition
                 if criterion.expected_upload:
-                    required_type = criterion.expected_upload.file_type
-                    has_doc = BidDocument.objects.filter(
-                        bid=evaluation.bid, document_type=required_type
-                    ).exists()
+                    has_doc = criterion.expected_upload.file_type in present_types
                 else:
                     # Fallback: allow explicit boolean or numeric if no expected_upload is set
                     explicit_pass = payload.get('pass')
-                    has_doc = bool(explicit_pass) or (float(payload.get('score', 0) or 0) > 0)
+                    try:
+                        has_doc = bool(explicit_pass) or (float(payload.get('score', 0) or 0) > 0)
+                    except (ValueError, TypeError):
+                        has_doc = bool(explicit_pass)
                 return (float(criterion.max_points) if has_doc else 0.0, comments)
             elif ctype == EvaluationCriterion.TYPE_BOOLEAN:
                 # Fixed: Check for score first, then pass
@@ -170,114 +230,48 @@ class UpsertBidCriterionScoresSerializer(serializers.Serializer):
                 num = float(raw)
             except (ValueError, TypeError):
                 num = 0.0
-            return (min(num, float(criterion.max_points)), comments)
+            if not math.isfinite(num):
+                num = 0.0
+            return (max(min(num, float(criterion.max_points)), 0.0), comments)
+
+        # One row per criterion; a criterion sent twice keeps its last item
+        rows = {}
+        for item in items:
+            criterion = criteria[int(item['criterion'])]
+            score, comments = coerce_score(criterion, item)
+            rows[criterion.id] = BidCriterionScore(
+                evaluation=evaluation,
+                criterion=criterion,
+                score=Decimal(str(score)).quantize(CENT, rounding=ROUND_HALF_UP),
+                comments=comments,
+            )
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target; it uses the (evaluation, criterion) unique key
+        unique_fields = ['evaluation', 'criterion'] if connection.features.supports_update_conflicts_with_target else None
+        return BidCriterionScore.objects.bulk_create(
+            list(rows.values()),
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['score', 'comments'],
+        )
+
 
 def ensure_bid_has_required_uploads(bid: Bid) -> tuple[bool, list[str]]:
     """Check tender-defined required uploads are present on this bid."""
-    missing = []
-    # All tender-required uploads
-    req = bid.tender.upload_documents.filter(mandatory=True)
-    present_types = set(BidDocument.objects.filter(bid=bid).values_list('document_type', flat=True))
-    for r in req:
-        if r.file_type not in present_types:
-            missing.append(f"{r.name} ({r.file_type})")
-    ok = len(missing) == 0
-    return ok, missing
-
-# Helpers for computing scores and compliance
-from decimal import Decimal
-
-def _weighted_sum(rows):
-    # rows: iterable of (score, max_points, weight)
-    total_weight = Decimal('0')
-    acc = Decimal('0')
-    for s, max_pts, w in rows:
-        if max_pts and w:
-            acc += (Decimal(s) / Decimal(max_pts)) * Decimal(w)
-            total_weight += Decimal(w)
-    if total_weight == 0:
-        return Decimal('0')
-    return (acc / total_weight) * Decimal('100')
-
-def compute_financial_lowest_price(bid: Bid) -> Decimal:
-    prices = list(bid.tender.bids.values_list('total_bid_amount', flat=True))
-    if not prices:
-        return Decimal('0')
-    valid = [Decimal(p) for p in prices if p is not None]
-    if not valid:
-        return Decimal('0')
-    lowest = min(valid)
-    if not lowest or not bid.total_bid_amount:
-        return Decimal('0')
-    return (lowest / Decimal(bid.total_bid_amount)) * Decimal('100')
+    missing = missing_required_uploads([bid.pk]).get(bid.pk, [])
+    return not missing, missing
 
 class RecomputeEvaluationSerializer(serializers.Serializer):
     """Recompute technical/financial/overall and set compliance flags on BidEvaluation."""
 
     def save(self, **kwargs):
         evaluation: BidEvaluation = self.context['evaluation']
-        cfg = getattr(evaluation.bid.tender, 'evaluation_config', None)
-        if not cfg:
-            raise serializers.ValidationError("Tender evaluation config is not set.")
-
-        # Compliance evaluation (pass/fail gate)
-        comp_qs = evaluation.criterion_scores.select_related('criterion').filter(criterion__section='compliance')
-        comp_ok = True
-        for row in comp_qs:
-            crit = row.criterion
-            # For upload/boolean: score > 0 means pass; for score: treat >0 as pass unless you want thresholds
-            passed = Decimal(row.score or 0) > 0
-            if cfg.enforce_mandatory and crit.mandatory and not passed:
-                comp_ok = False
-                break
-
-        evaluation.technical_compliance = bool(comp_ok)
-        # Financial compliance can be tied to financial section presence; keep as before unless needed:
-        # evaluation.financial_compliance = evaluation.financial_compliance
-
-        # Technical subtotal
-        tech_rows = evaluation.criterion_scores.select_related('criterion').filter(criterion__section='technical')
-        tech_data = [(r.score, r.criterion.max_points, r.criterion.weight or 1) for r in tech_rows]
-        technical_score = _weighted_sum(tech_data)
-
-        # Technical pass mark gate
-        if getattr(cfg, 'technical_pass_mark', None) is not None:
-            try:
-                tpm = Decimal(cfg.technical_pass_mark)
-            except Exception:
-                tpm = Decimal('0')
-            if technical_score < tpm:
-                evaluation.technical_compliance = False
-
-        # Financial subtotal
-        if cfg.financial_method == TenderEvaluationConfig.FIN_METHOD_LOWEST_PRICE:
-            financial_score = compute_financial_lowest_price(evaluation.bid)
-        else:
-            fin_rows = evaluation.criterion_scores.select_related('criterion').filter(criterion__section='financial')
-            fin_data = [(r.score, r.criterion.max_points, r.criterion.weight or 1) for r in fin_rows]
-            financial_score = _weighted_sum(fin_data)
-
-        if cfg.cap_financial_score_at:
-            try:
-                cap = Decimal(cfg.cap_financial_score_at)
-                financial_score = min(financial_score, cap)
-            except Exception:
-                pass
-
-        # Overall: if compliance gate fails and compliance_required, you could zero overall
-        tw = Decimal(cfg.technical_weight or 0)
-        fw = Decimal(cfg.financial_weight or 0)
-        denom = tw + fw if (tw + fw) != 0 else Decimal('1')
-        overall = (technical_score * tw + financial_score * fw) / denom
-
-        if cfg.compliance_required and not evaluation.technical_compliance:
-            # Option: set overall to 0 to reflect disqualification
-            overall = Decimal('0')
-
-        evaluation.technical_score = technical_score
-        evaluation.financial_score = financial_score
-        evaluation.overall_score = overall
-        evaluation.save(update_fields=['technical_compliance', 'technical_score', 'financial_score', 'overall_score'])
+        try:
+            updated = recompute_tender_scores(evaluation.bid.tender, evaluation_ids=[evaluation.pk])
+        except ScoringConfigError as exc:
+            raise serializers.ValidationError(str(exc))
+        for ev in updated:
+            for field in ('technical_compliance', 'technical_score', 'financial_score', 'overall_score'):
+                setattr(evaluation, field, getattr(ev, field))
         return evaluation
 
 
@@ -1,7 +1,10 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Avg, Count, Q
-from .models import Bid, BidEvaluation
+from django.db.models import Avg, Count, DecimalField, F, Q, Value, Window
+from django.db.models.functions import Coalesce, Rank
+from django.utils.timezone import now
+from .models import Bid, BidEvaluation, TenderEvaluationConfig
 
 class AggregatePolicy:
     # You can later make these tender-configurable
@@ -10,6 +13,16 @@ class AggregatePolicy:
     UNANIMOUS = 'unanimous'
 
 
+def is_compliant(compliance_policy: str, passed: int, total: int) -> bool:
+    if compliance_policy == AggregatePolicy.ANY_FAIL_DISQUALIFIES:
+        return passed == total
+    if compliance_policy == AggregatePolicy.MAJORITY:
+        return passed > total / 2
+    if compliance_policy == AggregatePolicy.UNANIMOUS:
+        return passed == total
+    return True
+
+
 def aggregate_bid_scores(bid: Bid, compliance_policy: str = AggregatePolicy.ANY_FAIL_DISQUALIFIES,
                          min_evaluations: int = 1) -> dict:
     evqs = BidEvaluation.objects.filter(bid=bid)
@@ -35,13 +48,7 @@ def aggregate_bid_scores(bid: Bid, compliance_policy: str = AggregatePolicy.ANY_
 
     # Compliance decision
     passed = counts['passed'] or 0
-    compliant = True
-    if compliance_policy == AggregatePolicy.ANY_FAIL_DISQUALIFIES:
-        compliant = (passed == total)
-    elif compliance_policy == AggregatePolicy.MAJORITY:
-        compliant = (passed > total / 2)
-    elif compliance_policy == AggregatePolicy.UNANIMOUS:
-        compliant = (passed == total)
+    compliant = is_compliant(compliance_policy, passed, total)
 
     final_total = Decimal(avgs['overall'] or 0)
     final_tech = Decimal(avgs['tech'] or 0)
@@ -57,7 +64,7 @@ def aggregate_bid_scores(bid: Bid, compliance_policy: str = AggregatePolicy.ANY_
     bid.financial_score = final_fin
     bid.total_score = final_total
     bid.status = 'qualified' if compliant else 'disqualified'
-    bid.save(update_fields=['technical_score', 'financial_score', 'total_score', 'status'])
+    bid.save(update_fields=['technical_score', 'financial_score', 'total_score', 'status', 'updated_at'])
 
     return {
         'finalized': True,
@@ -69,23 +76,141 @@ def aggregate_bid_scores(bid: Bid, compliance_policy: str = AggregatePolicy.ANY_
     }
 
 
-def rank_tender_bids(tender) -> list[dict]:
-    # Order: highest total_score first; tie-breaker can be added later
+def aggregate_tender_scores(tender, compliance_policy: str = AggregatePolicy.ANY_FAIL_DISQUALIFIES,
+                            min_evaluations: int = 1) -> dict:
+    """``aggregate_bid_scores`` for every evaluated bid of the tender at once, then rank.
+
+    Evaluations are grouped by bid in one query and the policy is applied in memory; finalized
+    bids are written with one bulk_update and ranked, all in one transaction. Bids with fewer
+    than ``min_evaluations`` evaluations are reported and left untouched.
+    """
+    cfg = TenderEvaluationConfig.objects.filter(tender=tender).first()
+    zero_non_compliant = bool(cfg and cfg.compliance_required)
+    with transaction.atomic():
+        groups = {
+            row['bid_id']: row for row in
+            BidEvaluation.objects.filter(bid__tender=tender).order_by().values('bid_id').annotate(
+                total=Count('id'),
+                passed=Count('id', filter=Q(technical_compliance=True)),
+                tech=Avg('technical_score'),
+                fin=Avg('financial_score'),
+                overall=Avg('overall_score'),
+            )
+        }
+        bids = list(
+            Bid.objects.select_for_update().filter(tender=tender).exclude(status__in=['draft', 'withdrawn'])
+            .order_by('created_at')
+        )
+        updated, results = [], []
+        stamp = now()
+        for bid in bids:
+            row = groups.get(bid.pk)
+            total = row['total'] if row else 0
+            if total < min_evaluations:
+                results.append({
+                    'bid_id': str(bid.id),
+                    'finalized': False,
+                    'reason': f'Need at least {min_evaluations} evaluations; have {total}.',
+                })
+                continue
+            compliant = is_compliant(compliance_policy, row['passed'] or 0, total)
+            bid.technical_score = _cents(row['tech'])
+            bid.financial_score = _cents(row['fin'])
+            bid.total_score = _cents(row['overall']) if compliant or not zero_non_compliant else Decimal('0.00')
+            bid.status = 'qualified' if compliant else 'disqualified'
+            bid.updated_at = stamp
+            updated.append(bid)
+            results.append({
+                'bid_id': str(bid.id),
+                'finalized': True,
+                'technical_score': bid.technical_score,
+                'financial_score': bid.financial_score,
+                'total_score': bid.total_score,
+                'compliant': compliant,
+                'evaluations_count': total,
+            })
+        if updated:
+            Bid.objects.bulk_update(
+                updated, ['technical_score', 'financial_score', 'total_score', 'status', 'updated_at'], batch_size=500)
+        ranking = rank_tender_bids(tender)
+    return {
+        'finalized': len(updated),
+        'pending': len(results) - len(updated),
+        'bids': results,
+        'ranking': ranking,
+    }
+
+
+def _cents(value) -> Decimal:
+    return Decimal(value or 0).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+# Orderings applied after total_score (highest first) to split equal scores
+TIE_BREAKERS = {
+    'lowest_price': F('total_bid_amount').asc(nulls_last=True),
+    'earliest_submission': F('submitted_at').asc(nulls_last=True),
+}
+DEFAULT_TIE_BREAKERS = ('lowest_price', 'earliest_submission')
+
+
+def tie_breakers_from(value=None) -> list[str]:
+    """Validated tie-breaker names from a list or comma-separated string; settings default when empty."""
+    if value is None or value == '':
+        value = getattr(settings, 'BID_RANKING_TIE_BREAKERS', DEFAULT_TIE_BREAKERS)
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        raise ValueError("tie_breakers must be a list of names or a comma-separated string")
+    names = [n for n in (v.strip() for v in value) if n and n != 'none']
+    unknown = [n for n in names if n not in TIE_BREAKERS]
+    if unknown:
+        raise ValueError(f"Unknown tie breaker(s) {unknown}; use {sorted(TIE_BREAKERS)} or 'none'")
+    return names
+
+
+def ranked_bids(tender, tie_breakers=None):
+    """The tender's bids annotated with ``rank`` (1 = best), computed by the database.
+
+    Ordered by total_score (missing scores count as 0), then each tie breaker; bids equal on all
+    keys share a rank and the next rank is skipped, as in competition ranking.
+    """
+    order_by = [Coalesce('total_score', Value(Decimal('0')), output_field=DecimalField()).desc()]
+    order_by += [TIE_BREAKERS[name] for name in tie_breakers_from(tie_breakers)]
+    return (
+        Bid.objects.filter(tender=tender)
+        .annotate(rank=Window(expression=Rank(), order_by=order_by))
+        .order_by('rank', 'id')
+    )
+
+
+def live_tender_ranking(tender, tie_breakers=None, offset: int = 0, limit: int = 100) -> list[dict]:
+    """One page of the current ranking; reads only that page and writes nothing."""
+    rows = ranked_bids(tender, tie_breakers).values(
+        'id', 'supplier_id', 'bid_reference', 'status', 'total_score', 'total_bid_amount', 'submitted_at', 'rank',
+    )[offset:offset + limit]
+    return [
+        {
+            'bid_id': str(r['id']),
+            'bid_reference': r['bid_reference'],
+            'supplier_id': r['supplier_id'],
+            'status': r['status'],
+            'total_score': r['total_score'],
+            'total_bid_amount': r['total_bid_amount'],
+            'submitted_at': r['submitted_at'],
+            'ranking': r['rank'],
+        } for r in rows
+    ]
+
+
+def rank_tender_bids(tender, tie_breakers=None) -> list[dict]:
+    """Store the database-computed rank in Bid.ranking; only rows whose rank changed are written."""
     with transaction.atomic():
-        bids = list(Bid.objects.filter(tender=tender).select_related('tender'))
-        # Sort by total_score desc (None treated as 0)
-        bids.sort(key=lambda b: (float(b.total_score or 0),), reverse=True)
-        prev_score = None
-        rank = 0
-        for idx, b in enumerate(bids, start=1):
-            score = float(b.total_score or 0)
-            if prev_score is None or score < prev_score:
-                rank = idx
-            prev_score = score
-            b.ranking = rank
-        if bids:
-            Bid.objects.bulk_update(bids, ['ranking'])
+        rows = list(ranked_bids(tender, tie_breakers).values_list('id', 'total_score', 'ranking', 'rank'))
+        stamp = now()
+        changed = [Bid(pk=pk, ranking=rank, updated_at=stamp) for pk, _, ranking, rank in rows if ranking != rank]
+        if changed:
+            Bid.objects.bulk_update(changed, ['ranking', 'updated_at'], batch_size=500)
         return [
-            {'bid_id': str(b.id), 'total_score': float(b.total_score or 0), 'ranking': b.ranking}
-            for b in bids
-        ]
\ No newline at end of file
+            {'bid_id': str(pk), 'total_score': float(total or 0), 'ranking': rank}
+            for pk, total, _, rank in rows
+        ]
@@ -1,3 +1,257 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from notifications.models import Notification
+from tenders.models import Category, Tender
+from users.models import ProcuringEntity, User
+
+from .intake import process_pending_submissions, record_submission
+from .models import (Bid, BidCriterionScore, BidEvaluation, BidSubmissionIntake, EvaluationCommittee,
+                     EvaluationCriterion, TenderEvaluationConfig)
+from .scoring import recompute_tender_scores
+from .services import live_tender_ranking, rank_tender_bids, tie_breakers_from
+
+
+def create_tender(reference='MOH-2026-001'):
+    admin = User.objects.filter(is_superuser=True).first() or User.objects.create_superuser(
+        email='admin@example.com', password='x', username='admin', user_type='admin')
+    entity, _ = ProcuringEntity.objects.get_or_create(code='MOH', defaults={'name': 'Ministry of Health',
+                                                                           'entity_type': 'ministry'})
+    category, _ = Category.objects.get_or_create(code='MED', defaults={'name': 'Medical Supplies'})
+    return Tender.objects.create(
+        reference_number=reference, title='Supply of surgical gloves', description='Gloves', category=category,
+        procuring_entity=entity, procurement_method='open_domestic', closing_date=now() + timedelta(days=7),
+        status='published', created_by=admin,
+    )
+
+
+def create_supplier(n=0):
+    return User.objects.create_user(email=f'supplier{n}@example.com', password=None, username=f'supplier{n}',
+                                    user_type='supplier')
+
+
+class BidDetailETagTests(TestCase):
+    def setUp(self):
+        self.supplier = create_supplier()
+        self.bid = Bid.objects.create(tender=create_tender(), supplier=self.supplier, total_bid_amount=1000,
+                                      bid_validity_days=90)
+        self.client = APIClient()
+        self.client.force_authenticate(self.supplier)
+
+    def test_unchanged_bid_is_not_modified(self):
+        etag = self.client.get(f'/bids/bid/{self.bid.id}/')['ETag']
+        response = self.client.get(f'/bids/bid/{self.bid.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_submitting_changes_the_etag(self):
+        etag = self.client.get(f'/bids/bid/{self.bid.id}/')['ETag']
+        self.assertEqual(self.client.post(f'/bids/bid/{self.bid.id}/submit/').status_code, 200)
+
+        response = self.client.get(f'/bids/bid/{self.bid.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'submitted')
+
+    def test_status_written_without_updated_at_changes_the_etag(self):
+        etag = self.client.get(f'/bids/bid/{self.bid.id}/')['ETag']
+        Bid.objects.filter(pk=self.bid.pk).update(status='withdrawn')
+
+        response = self.client.get(f'/bids/bid/{self.bid.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'withdrawn')
+
+
+@override_settings(BID_SUBMISSION_MODE='queued')
+class QueuedSubmissionLoadTests(TransactionTestCase):
+    """A closing-time burst against the test database: every bid is submitted twice at once."""
+    BIDS = 30
+    CONCURRENCY = 10
+
+    def setUp(self):
+        tender = create_tender()
+        self.bids = [
+            Bid.objects.create(tender=tender, supplier=create_supplier(n), total_bid_amount=1000 + n,
+                               bid_validity_days=90)
+            for n in range(self.BIDS)
+        ]
+
+    def _submit(self, bid, start_together):
+        client = APIClient()
+        client.force_authenticate(bid.supplier)
+        try:
+            start_together.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        try:
+            return client.post(f'/bids/bid/{bid.id}/submit/').status_code
+        finally:
+            connection.close()
+
+    def test_burst_is_finalized_exactly_once_per_bid(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("concurrent writers need a server database or a file-backed SQLite test database")
+        start_together = threading.Barrier(self.CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=self.CONCURRENCY) as pool:
+            codes = list(pool.map(lambda bid: self._submit(bid, start_together), self.bids * 2))
+        self.assertEqual(set(codes), {202})
+        self.assertEqual(BidSubmissionIntake.objects.count(), self.BIDS)
+
+        # Two workers drain the queue side by side
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            outcomes = list(pool.map(lambda _: process_pending_submissions(workers=2, batch_size=5), range(2)))
+        self.assertEqual(sum(o['accepted'] for o in outcomes), self.BIDS)
+
+        for entry in BidSubmissionIntake.objects.select_related('bid'):
+            self.assertEqual(entry.status, 'accepted')
+            self.assertEqual(entry.attempts, 1)
+            self.assertEqual(entry.bid.status, 'submitted')
+            self.assertEqual(entry.bid.submitted_at, entry.received_at)
+        self.assertEqual(Notification.objects.filter(notification_type='bid_submitted').count(), self.BIDS)
+
+    def test_bid_withdrawn_while_queued_is_not_submitted(self):
+        bid = self.bids[0]
+        entry, created = record_submission(bid, bid.supplier)
+        self.assertTrue(created)
+        Bid.objects.filter(pk=bid.pk).update(status='withdrawn')
+
+        process_pending_submissions(workers=1)
+        entry.refresh_from_db()
+        bid.refresh_from_db()
+        self.assertEqual(entry.status, 'rejected')
+        self.assertEqual(bid.status, 'withdrawn')
+        self.assertIsNone(bid.submitted_at)
+
+
+class BidRankingTests(TestCase):
+    def setUp(self):
+        self.tender = create_tender()
+        start = now()
+
+        def bid(n, score, price, submitted_after):
+            return Bid.objects.create(
+                tender=self.tender, supplier=create_supplier(n), bid_validity_days=90, status='submitted',
+                total_score=score, total_bid_amount=price, submitted_at=start + timedelta(minutes=submitted_after))
+        self.b1 = bid(1, 80, 1000, 2)
+        self.b2 = bid(2, 80, 900, 3)
+        self.b3 = bid(3, 80, 900, 1)
+        self.b4 = bid(4, 90, 5000, 4)
+        self.b5 = bid(5, None, 100, 0)  # no score yet ranks last
+        self.client = APIClient()
+        self.client.force_authenticate(self.tender.created_by)
+
+    def stored(self):
+        return {b.pk: b.ranking for b in Bid.objects.filter(tender=self.tender)}
+
+    def test_default_tie_breakers_are_lowest_price_then_earliest_submission(self):
+        rank_tender_bids(self.tender)
+        self.assertEqual(self.stored(), {self.b4.pk: 1, self.b3.pk: 2, self.b2.pk: 3, self.b1.pk: 4, self.b5.pk: 5})
+
+    def test_without_tie_breakers_equal_scores_share_a_rank(self):
+        rank_tender_bids(self.tender, tie_breakers='none')
+        self.assertEqual(self.stored(), {self.b4.pk: 1, self.b3.pk: 2, self.b2.pk: 2, self.b1.pk: 2, self.b5.pk: 5})
+
+    def test_single_tie_breaker(self):
+        rank_tender_bids(self.tender, tie_breakers=['earliest_submission'])
+        self.assertEqual(self.stored(), {self.b4.pk: 1, self.b3.pk: 2, self.b1.pk: 3, self.b2.pk: 4, self.b5.pk: 5})
+
+    def test_live_ranking_pages_without_writing(self):
+        with self.assertNumQueries(1):
+            page = live_tender_ranking(self.tender, offset=1, limit=2)
+        self.assertEqual([(r['bid_id'], r['ranking']) for r in page], [(str(self.b3.pk), 2), (str(self.b2.pk), 3)])
+        self.assertEqual(set(self.stored().values()), {None})
+
+        response = self.client.get(f'/bids/tenders/{self.tender.id}/ranking', {'offset': 4, 'tie_breakers': 'none'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([r['ranking'] for r in response.data['results']], [5])
+
+    def test_invalid_tie_breakers_are_rejected(self):
+        for value in (5, {'lowest_price': True}, [1], ['bogus'], 'lowest_price,bogus'):
+            with self.assertRaises(ValueError):
+                tie_breakers_from(value)
+            response = self.client.post(f'/bids/tenders/{self.tender.id}/rank-bids', {'tie_breakers': value},
+                                        format='json')
+            self.assertEqual(response.status_code, 400, value)
+            self.assertEqual(response.data['code'], 'invalid_tie_breakers')
+        self.assertEqual(set(self.stored().values()), {None})
+
+
+class TenderScoringTests(TestCase):
+    """recompute_tender_scores against hand-computed results.
+
+    Technical is one criterion of weight 2 out of 40 points, so technical = 2.5 * score; financial
+    (criteria method) is one criterion out of 100 points. Overall = (70 * technical + 30 * financial) / 100,
+    from the unrounded section scores.
+    """
+
+    def setUp(self):
+        self.tender = create_tender()
+        self.config = TenderEvaluationConfig.objects.create(
+            tender=self.tender, technical_weight=70, financial_weight=30, technical_pass_mark=60,
+            compliance_required=True, enforce_mandatory=True,
+            financial_method=TenderEvaluationConfig.FIN_METHOD_CRITERIA, cap_financial_score_at=90)
+        criterion = EvaluationCriterion.objects.create
+        self.compliance = criterion(tender=self.tender, section='compliance', name='Tax clearance', mandatory=True,
+                                    max_points=1)
+        self.technical = criterion(tender=self.tender, section='technical', name='Experience', weight=2, max_points=40)
+        self.financial = criterion(tender=self.tender, section='financial', name='Price', weight=1, max_points=100)
+        committee = EvaluationCommittee.objects.create(tender=self.tender, committee_name='Committee',
+                                                       chairperson=self.tender.created_by, appointment_date=now().date())
+        self.evaluations = {}
+        for n, (price, compliance, technical, financial) in enumerate([
+            (1000, 1, '25.01', '80'),   # 62.525 technical: a .xx5 case
+            (800, 1, '20', '50'),       # technical 50, under the pass mark
+            (1600, 0, '40', '100'),     # fails the mandatory compliance criterion
+        ]):
+            bid = Bid.objects.create(tender=self.tender, supplier=create_supplier(n), total_bid_amount=price,
+                                     bid_validity_days=90, status='submitted')
+            evaluation = BidEvaluation.objects.create(bid=bid, evaluator=self.tender.created_by, committee=committee)
+            BidCriterionScore.objects.bulk_create([
+                BidCriterionScore(evaluation=evaluation, criterion=self.compliance, score=compliance),
+                BidCriterionScore(evaluation=evaluation, criterion=self.technical, score=Decimal(technical)),
+                BidCriterionScore(evaluation=evaluation, criterion=self.financial, score=Decimal(financial)),
+            ])
+            self.evaluations[n] = evaluation
+
+    def stored(self, n):
+        ev = BidEvaluation.objects.get(pk=self.evaluations[n].pk)
+        return ev.technical_compliance, str(ev.technical_score), str(ev.financial_score), str(ev.overall_score)
+
+    def test_criteria_financial_method(self):
+        recompute_tender_scores(self.tender)
+        # 62.525 is stored half to even; overall = 43.7675 + 24
+        self.assertEqual(self.stored(0), (True, '62.52', '80.00', '67.77'))
+        # Technical 50 is under the pass mark of 60, so the bid is non-compliant and overall is zeroed
+        self.assertEqual(self.stored(1), (False, '50.00', '50.00', '0.00'))
+        # Mandatory compliance criterion scored 0; financial 100 is capped at 90
+        self.assertEqual(self.stored(2), (False, '100.00', '90.00', '0.00'))
+
+    def test_lowest_price_financial_method(self):
+        self.config.financial_method = TenderEvaluationConfig.FIN_METHOD_LOWEST_PRICE
+        self.config.save()
+        recompute_tender_scores(self.tender)
+        # Financial = lowest price (800) / own price * 100, capped at 90
+        self.assertEqual(self.stored(0), (True, '62.52', '80.00', '67.77'))
+        self.assertEqual(self.stored(1), (False, '50.00', '90.00', '0.00'))
+        self.assertEqual(self.stored(2), (False, '100.00', '50.00', '0.00'))
+
+    def test_pass_mark_gate_only_zeroes_overall_when_compliance_is_required(self):
+        self.config.compliance_required = False
+        self.config.save()
+        recompute_tender_scores(self.tender)
+        # (70 * 50 + 30 * 50) / 100
+        self.assertEqual(self.stored(1), (False, '50.00', '50.00', '50.00'))
+        # (70 * 100 + 30 * 90) / 100
+        self.assertEqual(self.stored(2), (False, '100.00', '90.00', '97.00'))
+
+    def test_unchanged_results_are_not_written_again(self):
+        recompute_tender_scores(self.tender)
+        # config, criteria, evaluations, criterion scores; no UPDATE
+        with self.assertNumQueries(4):
+            recompute_tender_scores(self.tender)
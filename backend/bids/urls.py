@@ -5,7 +5,9 @@ from .views import (
     CreateBidView,
     BidDetailView,
     SubmitBidView,
+    BidSubmissionStatusView,
     BidDocumentUploadView,
+    BidDocumentReuseView,
     UnsubmitBidView,
     ChangeBidStatusView,
     MyContractsView,
@@ -15,9 +17,10 @@ from .views import (
     SupplierPerformanceView,
     TenderRequiredUploadsView,
     BidDocumentsListForEvaluation,
-    BidDocumentServeView, tender_evaluation_config_view, criteria_list_create, criterion_detail_view,
+    BidDocumentServeView, TenderBidDocumentsArchiveView, TenderUploadComplianceView, tender_evaluation_config_view, criteria_list_create, criterion_detail_view,
     upsert_evaluation_scores, recompute_evaluation_totals, tender_required_uploads,
-    get_or_create_evaluation, aggregate_bid_view, rank_tender_view,
+    get_or_create_evaluation, aggregate_bid_view, aggregate_tender_view, rank_tender_view, live_ranking_view,
+    recompute_tender_evaluations,
 )
 
 urlpatterns = [
@@ -26,9 +29,11 @@ urlpatterns = [
     path('create-bid/<uuid:tender_id>/', CreateBidView.as_view(), name='create_bid'),
     path('bid/<uuid:bid_id>/', BidDetailView.as_view(), name='bid_detail'),
     path('bid/<uuid:bid_id>/submit/', SubmitBidView.as_view(), name='submit_bid'),
+    path('bid/<uuid:bid_id>/submission/', BidSubmissionStatusView.as_view(), name='bid_submission_status'),
     path('bid/<uuid:bid_id>/unsubmit/', UnsubmitBidView.as_view(), name='unsubmit_bid'),
     path('bid/<uuid:bid_id>/status/', ChangeBidStatusView.as_view(), name='change_bid_status'),
     path('bid/<uuid:bid_id>/documents/', BidDocumentUploadView.as_view(), name='bid_documents'),
+    path('bid/<uuid:bid_id>/documents/reuse/', BidDocumentReuseView.as_view(), name='bid_documents_reuse'),
     path('contracts/mine/', MyContractsView.as_view(), name='my_contracts'),
     path('contracts/entity/', EntityContractsView.as_view(), name='entity_contracts'),
     path('contracts/create/', CreateContractView.as_view(), name='create_contract'),
@@ -36,7 +41,11 @@ urlpatterns = [
     path('suppliers/performance/', SupplierPerformanceView.as_view(), name='supplier_performance'),
     path('tenders/<uuid:tender_id>/required-uploads/', TenderRequiredUploadsView.as_view(), name='tender_required_uploads'),
     path('bid/<uuid:bid_id>/documents/list/', BidDocumentsListForEvaluation.as_view(), name='bid_documents_list_eval'),
-    path('documents/<uuid:doc_id>/view/', BidDocumentServeView.as_view(), name='bid_document_serve'),
+    path('documents/<int:doc_id>/view/', BidDocumentServeView.as_view(), name='bid_document_serve'),
+    path('tenders/<uuid:tender_id>/uploads/compliance/', TenderUploadComplianceView.as_view(),
+         name='tender_upload_compliance'),
+    path('tenders/<uuid:tender_id>/documents/archive/', TenderBidDocumentsArchiveView.as_view(),
+         name='tender_bid_documents_archive'),
     path('evaluations/', get_or_create_evaluation, name='get-or-create-evaluation'),
     path('tenders/<uuid:tender_id>/evaluation/config', tender_evaluation_config_view, name='tender-eval-config'),
     path('tenders/<uuid:tender_id>/evaluation/criteria', criteria_list_create, name='criteria-list-create'),
@@ -44,10 +53,14 @@ urlpatterns = [
 
     path('evaluations/<int:evaluation_id>/scores', upsert_evaluation_scores, name='upsert-eval-scores'),
     path('evaluations/<int:evaluation_id>/recompute', recompute_evaluation_totals, name='recompute-eval-totals'),
+    path('tenders/<uuid:tender_id>/evaluation/recompute', recompute_tender_evaluations,
+         name='recompute-tender-evaluations'),
 
     # Aggregation and ranking
     path('bids/<uuid:bid_id>/aggregate', aggregate_bid_view, name='aggregate-bid'),
     path('tenders/<uuid:tender_id>/rank-bids', rank_tender_view, name='rank-tender-bids'),
+    path('tenders/<uuid:tender_id>/ranking', live_ranking_view, name='live-tender-ranking'),
+    path('tenders/<uuid:tender_id>/aggregate', aggregate_tender_view, name='aggregate-tender-bids'),
 
     path('tenders/<uuid:tender_id>/required-uploads/', tender_required_uploads, name='tender-required-uploads'),
 ]
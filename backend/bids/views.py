@@ -1,3 +1,5 @@
+import os
+
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
 from django.db.models import Q, Count, Avg
@@ -8,16 +10,27 @@ from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnl
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import FileResponse, Http404
+from django.http import Http404, StreamingHttpResponse
 
 from tenders.models import Tender, TenderUploadDocuments
+from tenders.search import search_tenders
+from tenders.categories import category_subtree_ids
+from tenders.requirements import upload_requirements
+from uploads.storage import is_blob
+from uploads.serving import serve_file
+from uploads.archive import stream_zip, safe_component, unique_name
+from tenders.etags import make_etag, etag_matches, not_modified, with_etag
 from users.models import EntityUser, ProcuringEntity
 from .models import Bid, BidDocument, Contract, BidEvaluation, EvaluationCriterion, TenderEvaluationConfig, \
-    EvaluationCommittee
+    EvaluationCommittee, BidSubmissionIntake
 from .serializer import OpportunitySerializer, BidListSerializer, BidCreateSerializer, RecomputeEvaluationSerializer, \
     UpsertBidCriterionScoresSerializer, EvaluationCriterionSerializer, TenderEvaluationConfigSerializer, \
     ensure_bid_has_required_uploads
-from .services import aggregate_bid_scores, rank_tender_bids, AggregatePolicy
+from .services import aggregate_bid_scores, aggregate_tender_scores, rank_tender_bids, AggregatePolicy, \
+    live_tender_ranking, tie_breakers_from
+from .intake import submission_mode, record_submission, intake_payload
+from .compliance import missing_required_uploads
+from .scoring import recompute_tender_scores, ScoringConfigError
 
 
 class OpportunitiesListView(APIView):
@@ -28,12 +41,17 @@ class OpportunitiesListView(APIView):
         search = request.query_params.get('search')
         category = request.query_params.get('category')
         status_param = request.query_params.get('status')
-        ordering = request.query_params.get('ordering') or '-created_at'
+        ordering = request.query_params.get('ordering')
 
-        if search:
-            qs = qs.filter(Q(title__icontains=search) | Q(reference_number__icontains=search))
         if category:
-            qs = qs.filter(Q(category__name__iexact=category) | Q(category__id=category))
+            # Matches by id or name and includes subcategories
+            subtree = category_subtree_ids(category)
+            qs = qs.filter(Q(category_id__in=subtree) | Q(subcategory_id__in=subtree))
+        # Search last, so its result limit counts only tenders the other filters allow
+        if search:
+            qs = search_tenders(qs, search)
+        elif not ordering:
+            ordering = '-created_at'
         if status_param == 'closed':
             qs = Tender.objects.filter(status='closed')
         elif status_param == 'open':
@@ -181,6 +199,38 @@ def recompute_evaluation_totals(request, evaluation_id):
     })
 
 
+# Recompute totals of every evaluation of a tender in one batch
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def recompute_tender_evaluations(request, tender_id):
+    tender = get_object_or_404(Tender, id=tender_id)
+    user = request.user
+    if not (
+        user.is_superuser
+        or user.id == tender.created_by_id
+        or EntityUser.objects.filter(user=user, entity_id=tender.procuring_entity_id, status='active').exists()
+    ):
+        return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        evaluations = recompute_tender_scores(tender)
+    except ScoringConfigError as exc:
+        return Response({'error': str(exc), 'code': 'no_evaluation_config'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'recomputed': len(evaluations),
+        'results': [
+            {
+                'evaluation_id': ev.id,
+                'bid_id': str(ev.bid_id),
+                'evaluator_id': ev.evaluator_id,
+                'technical_compliance': ev.technical_compliance,
+                'technical_score': ev.technical_score,
+                'financial_score': ev.financial_score,
+                'overall_score': ev.overall_score,
+            } for ev in evaluations
+        ],
+    })
+
+
 # Aggregate across evaluators for a bid
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -214,9 +264,63 @@ def rank_tender_view(request, tender_id):
         or EntityUser.objects.filter(user=user, entity=tender.procuring_entity, status='active').exists()
     ):
         return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-    out = rank_tender_bids(tender)
+    try:
+        tie_breakers = tie_breakers_from(request.data.get('tie_breakers'))
+    except ValueError as exc:
+        return Response({'error': str(exc), 'code': 'invalid_tie_breakers'}, status=status.HTTP_400_BAD_REQUEST)
+    out = rank_tender_bids(tender, tie_breakers=tie_breakers)
     return Response({'results': out}, status=status.HTTP_200_OK)
 
+
+# Current ranking computed on the fly, without storing it
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def live_ranking_view(request, tender_id):
+    tender = get_object_or_404(Tender, id=tender_id)
+    user = request.user
+    if not (
+        user.is_superuser
+        or user == tender.created_by
+        or EntityUser.objects.filter(user=user, entity=tender.procuring_entity, status='active').exists()
+    ):
+        return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        tie_breakers = tie_breakers_from(request.query_params.get('tie_breakers'))
+    except ValueError as exc:
+        return Response({'error': str(exc), 'code': 'invalid_tie_breakers'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+        limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+    except ValueError:
+        return Response({'error': 'offset and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'count': Bid.objects.filter(tender=tender).count(),
+        'offset': offset,
+        'limit': limit,
+        'tie_breakers': tie_breakers,
+        'results': live_tender_ranking(tender, tie_breakers, offset=offset, limit=limit),
+    })
+
+# Aggregate every evaluated bid of a tender, then rank
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def aggregate_tender_view(request, tender_id):
+    tender = get_object_or_404(Tender, id=tender_id)
+    user = request.user
+    if not (
+        user.is_superuser
+        or user == tender.created_by
+        or EntityUser.objects.filter(user=user, entity=tender.procuring_entity, status='active').exists()
+    ):
+        return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+    policy = request.data.get('compliance_policy') or AggregatePolicy.ANY_FAIL_DISQUALIFIES
+    try:
+        min_evals = int(request.data.get('min_evaluations', 1) or 1)
+    except Exception:
+        min_evals = 1
+    result = aggregate_tender_scores(tender, compliance_policy=policy, min_evaluations=min_evals)
+    return Response(result, status=status.HTTP_200_OK)
+
 # Create or fetch evaluation for current user on a bid
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -331,9 +435,18 @@ class BidDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, bid_id):
-        bid = get_object_or_404(Bid, id=bid_id, supplier=request.user)
+        bid = get_object_or_404(Bid.objects.prefetch_related('items'), id=bid_id, supplier=request.user)
+        # BidItem has no timestamp of its own, so its rows are part of the version. status and
+        # submitted_at are included as well, so a write that skipped updated_at still changes the tag
+        etag = make_etag(
+            bid.pk, bid.updated_at.isoformat(), bid.status, bid.submitted_at.isoformat() if bid.submitted_at else '',
+            *((i.pk, i.item_number, i.description, i.quantity, i.unit_of_measure, i.unit_price, i.total_price,
+               i.specifications, i.brand, i.model, i.country_of_origin) for i in bid.items.all())
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
         serializer = BidCreateSerializer(bid)
-        return Response(serializer.data)
+        return with_etag(Response(serializer.data), etag)
 
     def patch(self, request, bid_id):
         bid = get_object_or_404(Bid, id=bid_id, supplier=request.user)
@@ -366,6 +479,8 @@ class SubmitBidView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, bid_id):
+        # Taken before any work so queued submissions are judged by arrival time
+        received_at = now()
         try:
             bid = Bid.objects.select_related('tender', 'supplier').get(id=bid_id)
         except Bid.DoesNotExist:
@@ -379,6 +494,14 @@ class SubmitBidView(APIView):
         if bid.status == 'submitted':
             return Response({'error': 'Bid is already submitted'}, status=status.HTTP_400_BAD_REQUEST)
 
+        if submission_mode() == 'queued':
+            # Acknowledge now; process_bid_submissions checks uploads and finalizes (see bids.intake)
+            if received_at > bid.tender.closing_date:
+                return Response({'error': 'Tender closed; submission received after the closing date',
+                                 'code': 'tender_closed'}, status=status.HTTP_400_BAD_REQUEST)
+            entry, _ = record_submission(bid, request.user, received_at)
+            return Response(intake_payload(entry), status=status.HTTP_202_ACCEPTED)
+
             # Enforce required uploads as defined on the tender
         ok, missing = ensure_bid_has_required_uploads(bid)
         if not ok:
@@ -393,12 +516,27 @@ class SubmitBidView(APIView):
         # All good: submit
         bid.status = 'submitted'
         bid.submitted_at = now()
-        bid.save(update_fields=['status', 'submitted_at'])
+        bid.save(update_fields=['status', 'submitted_at', 'updated_at'])
 
         return Response({'status': 'submitted', 'submitted_at': bid.submitted_at}, status=status.HTTP_200_OK)
     # ...
 
 
+class BidSubmissionStatusView(APIView):
+    """Latest queued submission of a bid, for polling after a 202 from SubmitBidView"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, bid_id):
+        bid = get_object_or_404(Bid, id=bid_id)
+        if request.user.id != bid.supplier_id and not request.user.is_superuser:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        entry = BidSubmissionIntake.objects.filter(bid=bid).order_by('-received_at', '-id').first()
+        if entry is None:
+            return Response({'error': 'No queued submission for this bid', 'code': 'not_found'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({**intake_payload(entry), 'bid_status': bid.status, 'submitted_at': bid.submitted_at})
+
+
 class UnsubmitBidView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -452,8 +590,8 @@ class BidDocumentUploadView(APIView):
         files = request.FILES.getlist('documents')
         # optional per-request document_type; when multiple files, apply same type
         provided_type = request.data.get('document_type')
-        # Map of file_type -> TenderUploadDocuments config for quick lookup
-        tender_reqs = {r.file_type: r for r in bid.tender.upload_documents.all()}
+        # Map of file_type -> requirement, cached per tender (tenders.requirements)
+        tender_reqs = upload_requirements(bid.tender_id)
         saved = []
         for f in files:
             doc_type = provided_type or 'other'
@@ -485,6 +623,61 @@ class BidDocumentUploadView(APIView):
         return Response({'uploaded': saved}, status=status.HTTP_201_CREATED)
 
 
+class BidDocumentReuseView(APIView):
+    """Attach one of the supplier's existing bid documents to another bid without re-uploading it.
+
+    Documents live in content-addressed storage, so this only adds a reference to the stored blob.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, bid_id):
+        bid = get_object_or_404(Bid, id=bid_id, supplier=request.user)
+        source = get_object_or_404(BidDocument, id=request.data.get('document_id'), bid__supplier=request.user)
+        provided_type = request.data.get('document_type')
+        doc_type = provided_type or source.document_type
+        tender_reqs = upload_requirements(bid.tender_id)
+        cfg = tender_reqs.get(doc_type)
+        if provided_type and not cfg:
+            return Response({
+                'error': f"Invalid document_type '{provided_type}' for this tender.",
+                'allowed_types': list(tender_reqs.keys())
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if cfg and cfg.max_file_size and source.file_size and int(source.file_size) > int(cfg.max_file_size):
+            return Response({
+                'error': f"File '{source.document_name}' exceeds maximum size for {cfg.name} ({cfg.max_file_size} bytes)",
+                'code': 'file_too_large',
+                'limit': int(cfg.max_file_size),
+                'actual': int(source.file_size),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        storage = source.file.storage
+        doc = BidDocument(
+            bid=bid,
+            document_name=cfg.name if cfg else source.document_name,
+            document_type=doc_type,
+            file_size=source.file_size,
+            mime_type=source.mime_type,
+            is_required=bool(getattr(cfg, 'mandatory', False)),
+        )
+        try:
+            if is_blob(source.file.name):
+                name = storage.add_reference(source.file.name)
+            else:
+                # Stored before deduplication: copy it once into the blob store
+                with source.file.open('rb') as fh:
+                    name = storage.save(source.file.name, fh)
+        except FileNotFoundError:
+            raise Http404('File not found')
+        doc.file.name = name
+        try:
+            doc.save()
+        except Exception:
+            storage.delete(name)
+            raise
+        return Response({'uploaded': [{'id': str(doc.id), 'name': doc.document_name, 'type': doc.document_type}]},
+                        status=status.HTTP_201_CREATED)
+
+
 class MyContractsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -734,33 +927,123 @@ class BidDocumentsListForEvaluation(APIView):
         return Response(out)
 
 
+class TenderUploadComplianceView(APIView):
+    """Mandatory-upload compliance of every non-draft bid of a tender, for evaluators"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, tender_id):
+        tender = get_object_or_404(Tender, id=tender_id)
+        user = request.user
+        if not (
+            user.is_superuser
+            or user.id == tender.created_by_id
+            or EntityUser.objects.filter(user=user, entity_id=tender.procuring_entity_id, status='active').exists()
+        ):
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        bids = list(
+            Bid.objects.filter(tender=tender).exclude(status='draft')
+            .select_related('supplier').order_by('submitted_at', 'created_at')
+        )
+        missing = missing_required_uploads([b.pk for b in bids]) if bids else {}
+        return Response({
+            'tender_id': str(tender.id),
+            'required': [
+                {'name': r.name, 'document_type': r.file_type}
+                for r in upload_requirements(tender.id).values() if r.mandatory
+            ],
+            'bids': [
+                {
+                    'bid_id': str(b.id),
+                    'bid_reference': b.bid_reference,
+                    'supplier': b.supplier.username,
+                    'status': b.status,
+                    'complete': b.pk not in missing,
+                    'missing_documents': missing.get(b.pk, []),
+                } for b in bids
+            ],
+        })
+
+
+class TenderBidDocumentsArchiveView(APIView):
+    """Every submitted bid's documents for a tender as one ZIP, one folder per bidder.
+
+    The archive is streamed while it is built (see uploads.archive), so a pack of any size costs one
+    request and bounded memory. Authorization is checked once for the whole pack.
+    """
+    permission_classes = [IsAuthenticated]
+    EXCLUDED_STATUSES = ('draft', 'withdrawn')
+
+    def get(self, request, tender_id):
+        tender = get_object_or_404(Tender, id=tender_id)
+        user = request.user
+        # Same rule as BidDocumentsListForEvaluation: superuser, tender creator or procuring entity member
+        if not (
+            user.is_superuser
+            or user.id == tender.created_by_id
+            or EntityUser.objects.filter(user=user, entity_id=tender.procuring_entity_id, status='active').exists()
+        ):
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+
+        docs = (BidDocument.objects
+                .filter(bid__tender=tender)
+                .exclude(bid__status__in=self.EXCLUDED_STATUSES)
+                .select_related('bid__supplier__supplier_profile')
+                .order_by('bid__bid_reference', 'document_type', 'document_name', 'id'))
+        if not docs.exists():
+            return Response({'error': 'No submitted bid documents for this tender', 'code': 'no_documents'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(stream_zip(self._entries(docs)), content_type='application/zip')
+        filename = safe_component(f"{tender.reference_number}-bid-documents", 'bid-documents')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+        response['Cache-Control'] = 'private'
+        # Stop nginx from buffering the whole archive before passing it on
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def _bidder_label(bid):
+        profile = getattr(bid.supplier, 'supplier_profile', None)
+        return (profile.company_name if profile else '') or bid.supplier.username
+
+    def _entries(self, docs):
+        folders = {}
+        taken = set()
+        names = {}
+        for doc in docs.iterator(chunk_size=500):
+            bid = doc.bid
+            if bid.id not in folders:
+                folders[bid.id] = unique_name(
+                    safe_component(f"{self._bidder_label(bid)} - {bid.bid_reference}", str(bid.id)), taken)
+                names[bid.id] = set()
+            ext = os.path.splitext(doc.file.name)[1]
+            base = safe_component(f"{doc.document_type} - {doc.document_name}")
+            if ext and not base.lower().endswith(ext.lower()):
+                base += ext
+            arcname = f"{folders[bid.id]}/{unique_name(base, names[bid.id])}"
+            yield arcname, doc.file, doc.file_size, doc.uploaded_at
+
+
 class BidDocumentServeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, doc_id):
-        doc = get_object_or_404(BidDocument, id=doc_id)
+        doc = get_object_or_404(BidDocument.objects.select_related('bid__tender'), id=doc_id)
         bid = doc.bid
         tender = bid.tender
         user = request.user
         # Permissions: owner supplier of the bid, superuser, tender creator or procuring entity member
         if not (
             user.is_superuser
-            or user == bid.supplier
-            or user == tender.created_by
-            or EntityUser.objects.filter(user=user, entity=tender.procuring_entity, status='active').exists()
+            or user.id == bid.supplier_id
+            or user.id == tender.created_by_id
+            or EntityUser.objects.filter(user=user, entity_id=tender.procuring_entity_id, status='active').exists()
         ):
             return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
         try:
             download = request.query_params.get('download') in ['1', 'true', 'yes']
-            response = FileResponse(doc.file.open('rb'))
-            # Set content type if known
-            if doc.mime_type:
-                response['Content-Type'] = doc.mime_type
-            # Content-Disposition
-            if download:
-                response['Content-Disposition'] = f'attachment; filename="{doc.document_name}"'
-            else:
-                response['Content-Disposition'] = f'inline; filename="{doc.document_name}"'
-            return response
+            # Accelerated (X-Accel-Redirect / X-Sendfile) or Range-aware delivery, see uploads.serving
+            return serve_file(request, doc.file, content_type=doc.mime_type, filename=doc.document_name,
+                              as_attachment=download)
         except FileNotFoundError:
             raise Http404('File not found')
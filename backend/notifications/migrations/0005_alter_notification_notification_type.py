@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_alter_systemmessage_start_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('tender_published', 'Tender Published'), ('tender_amendment', 'Tender Amendment'), ('tender_closed', 'Tender Closed'), ('bid_submitted', 'Bid Submitted'), ('evaluation_result', 'Evaluation Result'), ('contract_awarded', 'Contract Awarded'), ('system', 'System'), ('reminder', 'Reminder')], max_length=20),
+        ),
+    ]
@@ -13,6 +13,7 @@ class Notification(models.Model):
     NOTIFICATION_TYPES = [
         ('tender_published', 'Tender Published'),
         ('tender_amendment', 'Tender Amendment'),
+        ('tender_closed', 'Tender Closed'),
         ('bid_submitted', 'Bid Submitted'),
         ('evaluation_result', 'Evaluation Result'),
         ('contract_awarded', 'Contract Awarded'),
@@ -43,6 +44,10 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's (unread) notifications, newest first
+            models.Index(fields=['user', 'is_read', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
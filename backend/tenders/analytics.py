@@ -0,0 +1,217 @@
+"""
+Procurement analytics computed with grouped queries, plus the daily rollup that backs
+``procurement_analytics``.
+
+Rollup rows bucket tenders by (closing date, procuring entity, category) and store additive
+figures (counts and day totals), so any date range or grouping can be re-aggregated with SUM.
+"""
+import math
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils.timezone import localtime
+
+from .models import Tender, ProcurementDailyRollup
+
+
+def tender_evaluation_rows(qs=None):
+    """One row per tender: closing date, bid count and the date of its last bid evaluation."""
+    qs = Tender.objects.all() if qs is None else qs
+    return (
+        qs.order_by()
+        .annotate(
+            bid_count=Count('bids', distinct=True),
+            last_evaluation=Max('bids__evaluations__evaluation_date'),
+        )
+        .values('id', 'closing_date', 'procuring_entity_id', 'category_id', 'bid_count', 'last_evaluation')
+    )
+
+
+def evaluation_days(closing_date, last_evaluation):
+    """Days from closing to last evaluation, clamped at 0 for reporting sanity."""
+    days = (last_evaluation - closing_date).total_seconds() / 86400.0
+    return days if days >= 0 else 0.0
+
+
+def live_procurement_metrics(qs=None) -> dict:
+    total_tenders = 0
+    total_bids = 0
+    eval_days = []
+    for row in tender_evaluation_rows(qs).iterator():
+        total_tenders += 1
+        total_bids += row['bid_count']
+        if row['closing_date'] and row['last_evaluation']:
+            eval_days.append(evaluation_days(row['closing_date'], row['last_evaluation']))
+    return {
+        'average_bid_count_per_tender': round(total_bids / total_tenders, 2) if total_tenders else 0.0,
+        'average_evaluation_time_days': round(sum(eval_days) / len(eval_days), 2) if eval_days else None,
+    }
+
+
+def _days_touched_since(since) -> set:
+    """Closing dates before ``since`` of tenders with a bid evaluation recorded on/after ``since``."""
+    return set(
+        Tender.objects.filter(closing_date__date__lt=since, bids__evaluations__evaluation_date__date__gte=since)
+        .order_by().values_list('closing_date__date', flat=True).distinct()
+    )
+
+
+def build_procurement_rollups(since=None) -> int:
+    """Recompute rollup rows for days on/after ``since`` (all when None). Returns rows written.
+
+    Evaluations are recorded after closing, so the closing-date buckets of older tenders evaluated
+    on/after ``since`` are rebuilt as well.
+    """
+    qs = Tender.objects.all()
+    earlier_days = set()
+    if since is not None:
+        earlier_days = _days_touched_since(since)
+        qs = qs.filter(Q(closing_date__date__gte=since) | Q(closing_date__date__in=earlier_days))
+
+    buckets = defaultdict(lambda: {'tender_count': 0, 'bid_count': 0, 'evaluated_tender_count': 0,
+                                   'evaluation_days_total': 0.0})
+    for row in tender_evaluation_rows(qs).iterator():
+        key = (localtime(row['closing_date']).date(), row['procuring_entity_id'], row['category_id'])
+        b = buckets[key]
+        b['tender_count'] += 1
+        b['bid_count'] += row['bid_count']
+        if row['last_evaluation']:
+            b['evaluated_tender_count'] += 1
+            b['evaluation_days_total'] += evaluation_days(row['closing_date'], row['last_evaluation'])
+
+    rows = [
+        ProcurementDailyRollup(
+            date=day, procuring_entity_id=entity_id, category_id=category_id,
+            tender_count=b['tender_count'], bid_count=b['bid_count'],
+            evaluated_tender_count=b['evaluated_tender_count'],
+            evaluation_days_total=Decimal(str(round(b['evaluation_days_total'], 2))),
+        )
+        for (day, entity_id, category_id), b in buckets.items()
+    ]
+    with transaction.atomic():
+        stale = ProcurementDailyRollup.objects.all()
+        if since is not None:
+            stale = stale.filter(Q(date__gte=since) | Q(date__in=earlier_days))
+        stale.delete()
+        ProcurementDailyRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _ratio(num, den, digits=2):
+    if not den:
+        return None
+    return round(float(num or 0) / float(den), digits)
+
+
+SERIES_GROUPINGS = {
+    'entity': 'procuring_entity_id',
+    'category': 'category_id',
+}
+
+
+def rollup_metrics(qs, interval=None, group_by=None) -> dict:
+    """Summarize rollup rows; with ``interval`` ('day'|'month') also return a time series."""
+    totals = qs.aggregate(
+        tenders=Sum('tender_count'), bids=Sum('bid_count'),
+        evaluated=Sum('evaluated_tender_count'), eval_days=Sum('evaluation_days_total'),
+    )
+    out = {
+        'average_bid_count_per_tender': _ratio(totals['bids'], totals['tenders']) or 0.0,
+        'average_evaluation_time_days': _ratio(totals['eval_days'], totals['evaluated']),
+    }
+    if interval in ('day', 'month'):
+        period = 'date' if interval == 'day' else 'period'
+        series_qs = qs.annotate(period=TruncMonth('date')) if interval == 'month' else qs
+        keys = [period] + ([SERIES_GROUPINGS[group_by]] if group_by in SERIES_GROUPINGS else [])
+        grouped = (
+            series_qs.order_by().values(*keys)
+            .annotate(tenders=Sum('tender_count'), bids=Sum('bid_count'),
+                      evaluated=Sum('evaluated_tender_count'), eval_days=Sum('evaluation_days_total'))
+            .order_by(*keys)
+        )
+        series = []
+        for g in grouped:
+            point = {
+                'period': g[period].isoformat(),
+                'tender_count': g['tenders'],
+                'bid_count': g['bids'],
+                'average_bid_count_per_tender': _ratio(g['bids'], g['tenders']),
+                'average_evaluation_time_days': _ratio(g['eval_days'], g['evaluated']),
+            }
+            if len(keys) > 1:
+                point[keys[1]] = g[keys[1]]
+            series.append(point)
+        out['series'] = series
+    return out
+
+
+CONTRACT_GROUPINGS = {
+    'entity': 'procuring_entity_id',
+    'month': 'month',
+}
+
+
+def _days(td):
+    return td.total_seconds() / 86400.0 if td is not None else None
+
+
+def _nearest_rank_positions(n, percentiles):
+    # 0-based index of the nearest-rank percentile in a sorted list of n values
+    return {p: max(math.ceil(p / 100.0 * n) - 1, 0) for p in percentiles}
+
+
+def contract_duration_stats(qs=None, group_by=(), percentiles=(50, 90)) -> list[dict]:
+    """Average and percentile days from tender creation to contract creation, computed in the database.
+
+    Averages come from one grouped ``Avg(F('created_at') - F('tender__created_at'))`` query. Percentiles
+    stream the ordered durations as scalar values (never Contract instances) and pick the nearest-rank
+    positions using the group sizes from the first query, so memory stays constant.
+    Returns one dict per group (a single dict when ``group_by`` is empty).
+    """
+    from bids.models import Contract
+    qs = Contract.objects.all() if qs is None else qs
+    keys = [CONTRACT_GROUPINGS[g] for g in group_by if g in CONTRACT_GROUPINGS]
+    qs = qs.order_by().annotate(
+        duration=ExpressionWrapper(F('created_at') - F('tender__created_at'), output_field=DurationField()),
+        month=TruncMonth('created_at'),
+    )
+
+    if keys:
+        summary = qs.values(*keys).annotate(contracts=Count('id'), avg_duration=Avg('duration')).order_by(*keys)
+    else:
+        summary = [qs.aggregate(contracts=Count('id'), avg_duration=Avg('duration'))]
+    groups = {tuple(row[k] for k in keys): row for row in summary if row['contracts']}
+    if not groups:
+        return []
+
+    stats = {
+        key: {'contracts': row['contracts'], 'avg': _days(row['avg_duration']),
+              'positions': _nearest_rank_positions(row['contracts'], percentiles), 'values': {}}
+        for key, row in groups.items()
+    }
+    current_key, index = None, 0
+    for row in qs.values_list(*keys, 'duration').order_by(*keys, 'duration').iterator():
+        key, duration = tuple(row[:-1]), row[-1]
+        if key != current_key:
+            current_key, index = key, 0
+        group = stats[key]
+        for p, pos in group['positions'].items():
+            if pos == index:
+                group['values'][p] = _days(duration)
+        index += 1
+
+    out = []
+    for key, group in stats.items():
+        entry = dict(zip(keys, key))
+        if entry.get('month') is not None:
+            entry['month'] = entry['month'].date().isoformat()
+        entry['contracts'] = group['contracts']
+        entry['avg_days_to_complete'] = round(group['avg'], 1) if group['avg'] is not None else 0.0
+        for p in percentiles:
+            val = group['values'].get(p)
+            entry[f'p{p}_days_to_complete'] = round(val, 1) if val is not None else None
+        out.append(entry)
+    return out
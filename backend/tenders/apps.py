@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TendersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tenders'
+
+    def ready(self):
+        from . import signals
+        signals.connect_dashboard_counters()
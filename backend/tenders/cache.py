@@ -0,0 +1,64 @@
+"""
+Response cache for the anonymous public tender endpoints.
+
+Entries are stored in the cache alias named by ``settings.PUBLIC_TENDER_CACHE_ALIAS`` so the
+backend can be swapped (file based, Redis) without touching the views. Every key embeds a
+generation number; tenders.signals bumps it whenever a Tender, Category or ProcuringEntity
+changes, which drops all cached payloads at once. The generation lives in the same alias, so it
+must be shared by all workers: with a local memory cache only the worker that made the change
+would stop serving stale entries. Entries never outlive the
+next closing date they depend on.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.timezone import now
+
+GENERATION_KEY = 'public_tenders:generation'
+DEFAULT_TIMEOUT = 300
+
+
+def get_cache():
+    return caches[getattr(settings, 'PUBLIC_TENDER_CACHE_ALIAS', 'default')]
+
+
+def _generation(cache) -> int:
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        # Seed from the clock so a lost key never resurrects entries from an older generation
+        cache.add(GENERATION_KEY, int(now().timestamp()), timeout=None)
+        gen = cache.get(GENERATION_KEY)
+    return gen
+
+
+def feed_cache_key(view_name: str, **params) -> str:
+    cache = get_cache()
+    normalized = json.dumps({k: (v or '') for k, v in params.items()}, sort_keys=True)
+    digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    return f"public_tenders:{_generation(cache)}:{view_name}:{digest}"
+
+
+def get_cached_feed(key: str):
+    return get_cache().get(key)
+
+
+def store_feed(key: str, payload, expires_at: datetime = None):
+    """Cache ``payload``; if ``expires_at`` is given the entry is dropped no later than that moment."""
+    timeout = getattr(settings, 'PUBLIC_TENDER_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    if expires_at is not None:
+        remaining = int((expires_at - now()).total_seconds())
+        if remaining <= 0:
+            return
+        timeout = min(timeout, remaining)
+    get_cache().set(key, payload, timeout=timeout)
+
+
+def invalidate_public_feed():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(now().timestamp()), timeout=None)
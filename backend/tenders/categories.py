@@ -0,0 +1,86 @@
+"""
+In-process cache of the category tree.
+
+The whole tree is loaded with one query ordered by ``Category.path`` and kept in process memory.
+Every read first asks the database for the tree's version (latest ``updated_at`` and row count,
+one small aggregate) and reloads when it differs. The version lives in the database, so an edit
+made by any worker is seen by all of them on their next read; the tree itself is only reloaded
+after a change.
+"""
+import threading
+
+from django.db.models import Count, Max
+
+NODE_FIELDS = ('id', 'name', 'code', 'description', 'level', 'is_active', 'parent_id', 'path')
+
+_state = {'version': None, 'tree': None}
+_lock = threading.Lock()
+
+
+class CategoryTree:
+    def __init__(self, rows):
+        # rows are ordered by path, so every parent is seen before its children
+        self.nodes = {row['id']: row for row in rows}
+        self.children = {}
+        for row in rows:
+            self.children.setdefault(row['parent_id'], []).append(row['id'])
+        for ids in self.children.values():
+            ids.sort(key=lambda cid: self.nodes[cid]['name'].lower())
+
+    def descendant_ids(self, category_id) -> set:
+        """``category_id`` and every category below it."""
+        if category_id not in self.nodes:
+            return set()
+        out, stack = set(), [category_id]
+        while stack:
+            cid = stack.pop()
+            out.add(cid)
+            stack.extend(self.children.get(cid, ()))
+        return out
+
+    def match(self, value) -> list:
+        """Ids of categories whose id or (case-insensitive) name equals ``value``."""
+        value = str(value).strip()
+        lowered = value.lower()
+        return [cid for cid, node in self.nodes.items()
+                if str(cid) == value or node['name'].lower() == lowered]
+
+    def as_nested(self, parent_id=None) -> list:
+        out = []
+        for cid in self.children.get(parent_id, ()):
+            node = {k: v for k, v in self.nodes[cid].items() if k != 'path'}
+            node['children'] = self.as_nested(cid)
+            out.append(node)
+        return out
+
+
+def _version(model) -> tuple:
+    version = model.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+    return version['latest'], version['count']
+
+
+def get_category_tree() -> CategoryTree:
+    from .models import Category
+    version = _version(Category)
+    tree = _state['tree']
+    if tree is not None and _state['version'] == version:
+        return tree
+    with _lock:
+        if _state['tree'] is None or _state['version'] != version:
+            rows = list(Category.objects.order_by('path').values(*NODE_FIELDS))
+            _state['tree'], _state['version'] = CategoryTree(rows), version
+        return _state['tree']
+
+
+def category_subtree_ids(value) -> set:
+    """Ids of the categories matching ``value`` (id or name) together with all their descendants."""
+    tree = get_category_tree()
+    ids = set()
+    for cid in tree.match(value):
+        ids |= tree.descendant_ids(cid)
+    return ids
+
+
+def invalidate_category_tree():
+    """Drop this process's copy right away; other processes notice the new version on their next read."""
+    _state['tree'] = None
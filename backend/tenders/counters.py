@@ -0,0 +1,93 @@
+"""
+Pre-aggregated counters backing DashboardView.
+
+Each counter is "number of <model> rows whose <field> is in <values>". Signals (tenders.signals)
+adjust the single DashboardCounters row with F() increments when a row enters or leaves a
+counter's set; ``reconcile_dashboard_counters`` recounts from scratch to correct any drift from
+writes that bypass signals (queryset.update(), raw SQL, fixtures).
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+# counter field -> (model label, field, values that are counted)
+COUNTER_RULES = {
+    'active_tenders': ('tenders.Tender', 'status', {'draft', 'published'}),
+    'active_contracts': ('bids.Contract', 'status', {'active'}),
+    'total_suppliers': ('users.User', 'user_type', {'supplier'}),
+    'pending_suppliers': ('users.SupplierProfile', 'verification_status', {'pending'}),
+}
+
+
+def rules_for_model(model):
+    label = model._meta.label
+    return [(counter, field, values) for counter, (m, field, values) in COUNTER_RULES.items() if m == label]
+
+
+def counted_models():
+    return {apps.get_model(label) for label, _, _ in COUNTER_RULES.values()}
+
+
+def _counters_model():
+    return apps.get_model('tenders', 'DashboardCounters')
+
+
+def remember_counted_values(instance, update_fields=None):
+    """Stash the stored values of counted fields before a save so post_save can compute deltas."""
+    rules = rules_for_model(type(instance))
+    fields = sorted({field for _, field, _ in rules if update_fields is None or field in update_fields})
+    if not fields or instance._state.adding or instance.pk is None:
+        instance._dashboard_previous = {}
+        return
+    row = type(instance)._default_manager.filter(pk=instance.pk).values(*fields).first()
+    instance._dashboard_previous = row or {}
+
+
+def apply_counter_changes(instance, deleted: bool = False, update_fields=None):
+    previous = getattr(instance, '_dashboard_previous', {})
+    deltas = {}
+    for counter, field, values in rules_for_model(type(instance)):
+        if update_fields is not None and field not in update_fields:
+            continue
+        was_counted = field in previous and previous[field] in values
+        if deleted:
+            is_counted = False
+            was_counted = getattr(instance, field) in values
+        else:
+            is_counted = getattr(instance, field) in values
+        if is_counted != was_counted:
+            deltas[counter] = F(counter) + (1 if is_counted else -1)
+    instance._dashboard_previous = {}
+    if deltas:
+        _counters_model().objects.filter(pk=1).update(**deltas)
+
+
+def compute_dashboard_counts() -> dict:
+    out = {}
+    for counter, (label, field, values) in COUNTER_RULES.items():
+        model = apps.get_model(label)
+        out[counter] = model._default_manager.filter(**{f'{field}__in': values}).count()
+    return out
+
+
+def reconcile_dashboard_counters() -> dict:
+    """Recount every counter and overwrite the stored row. Returns {counter: (stored, actual)} for drifted ones."""
+    Counters = _counters_model()
+    with transaction.atomic():
+        row, _ = Counters.objects.select_for_update().get_or_create(pk=1)
+        actual = compute_dashboard_counts()
+        drift = {k: (getattr(row, k), v) for k, v in actual.items() if getattr(row, k) != v}
+        for k, v in actual.items():
+            setattr(row, k, v)
+        row.reconciled_at = now()
+        row.save()
+    return drift
+
+
+def read_dashboard_counters():
+    row = _counters_model().objects.filter(pk=1).first()
+    if row is None:
+        reconcile_dashboard_counters()
+        row = _counters_model().objects.get(pk=1)
+    return row
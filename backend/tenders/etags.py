@@ -0,0 +1,59 @@
+"""
+Helpers for conditional GET (ETag / If-None-Match) on detail endpoints.
+
+ETags are computed from row versions (``updated_at`` and the related rows a payload embeds)
+rather than from the rendered body, so a matching request can be answered with 304 before
+anything is serialized.
+"""
+import hashlib
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = [c.strip() for c in header.split(',')]
+    return any(c[2:] == etag if c.startswith('W/') else c == etag for c in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def with_etag(response: Response, etag: str, private: bool = True) -> Response:
+    response['ETag'] = etag
+    # Clients may keep the body but must revalidate before reusing it
+    response['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    return response
+
+
+def tender_version_parts(tender, include_uploads: bool = True) -> tuple:
+    """Version of a tender's detail payload: its own row, the named FKs and (optionally) upload requirements.
+
+    Expects ``procuring_entity``/``category``/``subcategory`` to be select_related and
+    ``upload_documents`` to be prefetched when ``include_uploads`` is set.
+    """
+    parts = [
+        tender.pk,
+        tender.updated_at.isoformat(),
+        tender.procuring_entity.updated_at.isoformat(),
+        tender.category.updated_at.isoformat(),
+        tender.subcategory.updated_at.isoformat() if tender.subcategory_id else '',
+    ]
+    if include_uploads:
+        parts.extend(
+            (u.pk, u.name, u.file_type, u.max_file_size, u.mandatory)
+            for u in tender.upload_documents.all()
+        )
+    return tuple(parts)
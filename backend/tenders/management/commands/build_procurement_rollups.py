@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+
+from tenders.analytics import build_procurement_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily procurement analytics rollup (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only rebuild days on/after this date (YYYY-MM-DD), plus the closing "
+                                            "days of older tenders evaluated since then.")
+        parser.add_argument('--days', type=int, help="Only rebuild the last N days.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options.get('since'):
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("--since must be YYYY-MM-DD")
+        elif options.get('days'):
+            since = localdate() - timedelta(days=options['days'])
+        count = build_procurement_rollups(since=since)
+        scope = f"since {since}" if since else "for all dates"
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} rollup rows {scope}."))
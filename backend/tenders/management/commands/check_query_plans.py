@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tenders.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot procurement queries and fail if any of them falls back to a full table scan."
+
+    def handle(self, *args, **options):
+        results = check_query_plans()
+        styles = {'ok': self.style.SUCCESS, 'warn': self.style.WARNING, 'fail': self.style.ERROR}
+        for r in results:
+            self.stdout.write(styles[r['verdict']](f"[{r['verdict'].upper()}] {r['name']} ({r['table']}): {r['plan']}"))
+        failed = [r['name'] for r in results if r['verdict'] == 'fail']
+        if failed:
+            raise CommandError(f"Full table scan on {len(failed)} hot query(ies): {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} hot queries use an index."))
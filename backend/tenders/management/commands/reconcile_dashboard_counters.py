@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tenders.counters import reconcile_dashboard_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard counters from source tables and correct any drift. Safe to run periodically (e.g. cron)."
+
+    def handle(self, *args, **options):
+        drift = reconcile_dashboard_counters()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Dashboard counters are in sync."))
+            return
+        for name, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{name}: {stored} -> {actual}")
+        self.stdout.write(self.style.WARNING(f"Corrected {len(drift)} drifted counter(s)."))
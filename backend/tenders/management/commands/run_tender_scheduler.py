@@ -0,0 +1,49 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.timezone import now
+
+from tenders.scheduler import ClosingSchedule, close_due_tenders
+
+
+class Command(BaseCommand):
+    help = "Move published tenders to evaluation at their closing date. Runs as a long-lived worker unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Close everything already due and exit (for cron).")
+        parser.add_argument('--horizon', type=int, default=3600,
+                            help="Seconds ahead to load into the due-time heap (default 3600).")
+        parser.add_argument('--refresh', type=int, default=60,
+                            help="Seconds between heap reloads, to pick up new or changed deadlines (default 60).")
+        parser.add_argument('--batch-size', type=int, help="Tenders transitioned per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+        # Catch up on anything that closed while the worker was down
+        closed = close_due_tenders(batch_size=batch_size)
+        if closed:
+            self.stdout.write(f"Closed {closed} overdue tender(s).")
+        if options['once']:
+            return
+
+        schedule = ClosingSchedule(horizon=timedelta(seconds=options['horizon']))
+        refresh_every = timedelta(seconds=options['refresh'])
+        self.stdout.write(self.style.SUCCESS("Tender scheduler running."))
+        try:
+            while True:
+                close_old_connections()
+                schedule.refresh()
+                next_refresh = now() + refresh_every
+                while now() < next_refresh:
+                    due = schedule.pop_due()
+                    if due:
+                        closed = close_due_tenders(ids=due, batch_size=batch_size)
+                        if closed:
+                            self.stdout.write(f"Closed {closed} tender(s).")
+                    next_due = schedule.next_due()
+                    wake = min(next_due, next_refresh) if next_due else next_refresh
+                    time.sleep(max((wake - now()).total_seconds(), 0.05))
+        except KeyboardInterrupt:
+            self.stdout.write("Tender scheduler stopped.")
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0004_alter_tender_evaluation_criteria_and_more'),
+        ('users', '0004_profileeditrequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tender',
+            index=models.Index(fields=['-created_at', '-id'], name='tenders_ten_created_7947a4_idx'),
+        ),
+    ]
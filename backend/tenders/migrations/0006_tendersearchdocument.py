@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name('tenders_tendersearchdocument')
+    schema_editor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX tender_search_title_ft (title)")
+    schema_editor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX tender_search_all_ft (title, body)")
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name('tenders_tendersearchdocument')
+    schema_editor.execute(f"ALTER TABLE {table} DROP INDEX tender_search_all_ft")
+    schema_editor.execute(f"ALTER TABLE {table} DROP INDEX tender_search_title_ft")
+
+
+def backfill_documents(apps, schema_editor):
+    Tender = apps.get_model('tenders', 'Tender')
+    TenderSearchDocument = apps.get_model('tenders', 'TenderSearchDocument')
+    docs = []
+    for t in Tender.objects.select_related('procuring_entity', 'category', 'subcategory').iterator():
+        docs.append(TenderSearchDocument(
+            tender_id=t.pk,
+            title=' '.join(filter(None, [t.title, t.reference_number])),
+            body=' '.join(filter(None, [
+                t.description,
+                t.procuring_entity.name,
+                t.category.name,
+                t.subcategory.name if t.subcategory_id else '',
+            ])),
+        ))
+    TenderSearchDocument.objects.bulk_create(docs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0005_tender_tenders_ten_created_7947a4_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderSearchDocument',
+            fields=[
+                ('tender', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='tenders.tender')),
+                ('title', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(add_fulltext_indexes, drop_fulltext_indexes),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0006_tendersearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_tenders', models.BigIntegerField(default=0)),
+                ('active_contracts', models.BigIntegerField(default=0)),
+                ('total_suppliers', models.BigIntegerField(default=0)),
+                ('pending_suppliers', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard counters',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0007_dashboardcounters'),
+        ('users', '0004_profileeditrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcurementDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tender_count', models.PositiveIntegerField(default=0)),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('evaluated_tender_count', models.PositiveIntegerField(default=0)),
+                ('evaluation_days_total', models.DecimalField(decimal_places=2, default=0, help_text='Sum over evaluated tenders of days from closing to last evaluation', max_digits=15)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='procurement_rollups', to='tenders.category')),
+                ('procuring_entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='procurement_rollups', to='users.procuringentity')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('date', 'procuring_entity', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0008_procurementdailyrollup'),
+        ('users', '0004_profileeditrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderReferenceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('procuring_entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reference_sequences', to='users.procuringentity')),
+            ],
+            options={
+                'unique_together': {('procuring_entity', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:14
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Category = apps.get_model('tenders', 'Category')
+    rows = {c['id']: c for c in Category.objects.values('id', 'parent_id')}
+    children = {}
+    for row in rows.values():
+        children.setdefault(row['parent_id'], []).append(row['id'])
+
+    paths = {}
+    stack = [(cid, '') for cid in children.get(None, [])]
+    while stack:
+        cid, prefix = stack.pop()
+        paths[cid] = f"{prefix}{cid:08d}/"
+        stack.extend((child, paths[cid]) for child in children.get(cid, []))
+
+    objs = [Category(id=cid, path=path, level=path.count('/')) for cid, path in paths.items()]
+    Category.objects.bulk_update(objs, ['path', 'level'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0009_tenderreferencesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
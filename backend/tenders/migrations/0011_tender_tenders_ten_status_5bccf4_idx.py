@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0010_category_path'),
+        ('users', '0004_profileeditrequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tender',
+            index=models.Index(fields=['status', 'closing_date'], name='tenders_ten_status_5bccf4_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0011_tender_tenders_ten_status_5bccf4_idx'),
+        ('users', '0005_entityuser_users_entit_user_id_a108a1_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tender',
+            index=models.Index(fields=['status', '-created_at'], name='tenders_ten_status_9589ca_idx'),
+        ),
+    ]
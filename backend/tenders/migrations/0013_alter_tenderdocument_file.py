@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:22
+
+import tenders.models
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0012_tender_tenders_ten_status_9589ca_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenderdocument',
+            name='file',
+            field=models.FileField(storage=uploads.storage.get_document_storage, upload_to=tenders.models.tender_document_path),
+        ),
+    ]
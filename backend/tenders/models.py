@@ -1,11 +1,14 @@
 import uuid
 from datetime import timezone, datetime
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.utils.timezone import now
 
 from django.contrib.auth import get_user_model
 from users.models import ProcuringEntity
+from uploads.storage import get_document_storage
 
 User = get_user_model()
 
@@ -17,6 +20,8 @@ class Category(models.Model):
     description = models.TextField(blank=True)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='subcategories')
     level = models.PositiveIntegerField(default=1)
+    # Materialized path of zero-padded ancestor ids ("00000001/00000004/"); a subtree is path__startswith
+    path = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -27,6 +32,45 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    PATH_SEGMENT_WIDTH = 8
+
+    def build_path(self) -> str:
+        # Read the parent's stored path; an in-memory parent may predate a subtree move
+        prefix = ''
+        if self.parent_id:
+            prefix = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+        return f"{prefix}{self.pk:0{self.PATH_SEGMENT_WIDTH}d}/"
+
+    def save(self, *args, **kwargs):
+        """Keep ``path``/``level`` in sync with ``parent`` and move the subtree along when the parent changes."""
+        with transaction.atomic():
+            old_path = None
+            if self.pk is not None:
+                old_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).first()
+                self.path = self.build_path()
+                if old_path and self.path != old_path and self.path.startswith(old_path):
+                    raise ValueError("A category cannot be moved under one of its own subcategories")
+                self.level = self.path.count('/')
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    # updated_at versions the cached category tree (tenders.categories)
+                    kwargs['update_fields'] = set(update_fields) | {'updated_at'}
+                    if self.path != old_path:
+                        kwargs['update_fields'] |= {'path', 'level'}
+
+            super().save(*args, **kwargs)
+
+            if old_path is None and not self.path:
+                # New row: the path needs the id assigned by the insert
+                self.path = self.build_path()
+                self.level = self.path.count('/')
+                Category.objects.filter(pk=self.pk).update(path=self.path, level=self.level)
+            elif old_path and self.path != old_path:
+                Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                    level=F('level') + (self.path.count('/') - old_path.count('/')),
+                )
+
 
 class SupplierCategory(models.Model):
     """Links suppliers to categories they can bid for"""
@@ -159,6 +203,14 @@ class Tender(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination on the tender list walks (created_at, id) newest first
+            models.Index(fields=['-created_at', '-id']),
+            # Open-tender filters and the closing scheduler (tenders.scheduler)
+            models.Index(fields=['status', 'closing_date']),
+            # Status-filtered listings, newest first
+            models.Index(fields=['status', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.reference_number} - {self.title}"
@@ -205,19 +257,9 @@ class Tender(models.Model):
 
     @property
     def evaluation_ready(self) -> bool:
-        if not self.has_evaluation_config:
-            return False
-        cfg = self.evaluation_config
-        if not self.has_technical_criteria:
-            return False
-        if getattr(cfg, 'financial_method', None) == 'criteria' and not self.has_financial_criteria:
-            return False
-        if getattr(cfg, 'compliance_required', False):
-            has_comp = self.has_compliance_criteria
-            has_mandatory_uploads = self.upload_documents.filter(mandatory=True).exists()
-            if not (has_comp or has_mandatory_uploads):
-                return False
-        return True
+        # Same rules as the batch API used by listings (tenders.readiness)
+        from .readiness import evaluation_readiness
+        return evaluation_readiness([self.pk])[self.pk]['ready']
 
     @property
     def total_budget_allocation(self):
@@ -227,6 +269,71 @@ class Tender(models.Model):
         )['total'] or 0
 
 
+class TenderReferenceSequence(models.Model):
+    """Per-entity, per-year counter behind tender reference numbers (see tenders.references)"""
+    procuring_entity = models.ForeignKey(ProcuringEntity, on_delete=models.CASCADE, related_name='reference_sequences')
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['procuring_entity', 'year']
+
+    def __str__(self):
+        return f"{self.procuring_entity} {self.year}: {self.last_value}"
+
+
+class TenderSearchDocument(models.Model):
+    """Denormalized searchable text for a tender, maintained by tenders.signals (see tenders.search)"""
+    tender = models.OneToOneField(Tender, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    # Title + reference number; ranked higher than body matches
+    title = models.TextField(blank=True)
+    # Description, procuring entity and category names
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"SearchDocument {self.tender_id}"
+
+
+class DashboardCounters(models.Model):
+    """Single-row table of dashboard totals, kept current by signals (see tenders.counters)"""
+    active_tenders = models.BigIntegerField(default=0)
+    active_contracts = models.BigIntegerField(default=0)
+    total_suppliers = models.BigIntegerField(default=0)
+    pending_suppliers = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Dashboard counters"
+
+    def __str__(self):
+        return f"Dashboard counters (reconciled {self.reconciled_at})"
+
+
+class ProcurementDailyRollup(models.Model):
+    """Per-day, per-entity, per-category procurement figures, rebuilt by the build_procurement_rollups command.
+
+    Tenders are bucketed by the date of their closing_date; all figures are additive.
+    """
+    date = models.DateField()
+    procuring_entity = models.ForeignKey(ProcuringEntity, on_delete=models.CASCADE, related_name='procurement_rollups')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='procurement_rollups')
+    tender_count = models.PositiveIntegerField(default=0)
+    bid_count = models.PositiveIntegerField(default=0)
+    evaluated_tender_count = models.PositiveIntegerField(default=0)
+    evaluation_days_total = models.DecimalField(max_digits=15, decimal_places=2, default=0,
+                                                help_text="Sum over evaluated tenders of days from closing to last evaluation")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['date', 'procuring_entity', 'category']
+
+    def __str__(self):
+        return f"{self.date} - {self.procuring_entity_id}/{self.category_id}"
+
+
 def tender_document_path(instance, filename):
     return f'tenders/{instance.tender.id}/documents/{filename}'
 
@@ -256,7 +363,7 @@ class TenderDocument(models.Model):
     tender = models.ForeignKey(Tender, on_delete=models.CASCADE, related_name='documents')
     document_name = models.CharField(max_length=200)
     document_type = models.CharField(max_length=25, choices=DOCUMENT_TYPES)
-    file = models.FileField(upload_to=tender_document_path)
+    file = models.FileField(upload_to=tender_document_path, storage=get_document_storage)
     file_size = models.PositiveBigIntegerField(null=True, blank=True)
     mime_type = models.CharField(max_length=100, blank=True)
     is_mandatory = models.BooleanField(default=False)
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPagination:
+    """Keyset (cursor) pagination over a (created_at, id) ordering, newest first.
+
+    Each page is fetched with a single indexed range query instead of OFFSET, so the
+    cost of a page does not grow with its position in the table.
+    """
+    default_page_size = 25
+    max_page_size = 200
+
+    def __init__(self, request):
+        self.request = request
+        self.cursor = request.query_params.get('cursor') or None
+        self.page_size = self._parse_page_size(request.query_params.get('page_size'))
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        params = request.query_params
+        return 'cursor' in params or params.get('paginate') == 'cursor'
+
+    def _parse_page_size(self, raw):
+        try:
+            size = int(raw)
+        except (TypeError, ValueError):
+            return self.default_page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, pk) -> str:
+        raw = f"{created_at.isoformat()}|{pk}".encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            ts, pk = raw.split('|', 1)
+            # parse_datetime raises ValueError for well-formed but impossible dates
+            created_at = parse_datetime(ts)
+            pk = uuid.UUID(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+        if created_at is None:
+            raise InvalidCursor('Invalid cursor')
+        return created_at, pk
+
+    def paginate_queryset(self, qs):
+        qs = qs.order_by('-created_at', '-id')
+        if self.cursor:
+            created_at, pk = self.decode_cursor(self.cursor)
+            qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        rows = list(qs[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1].created_at, rows[-1].pk) if self.has_next else None
+        return rows
+
+    def get_paginated_payload(self, data):
+        return {
+            'results': data,
+            'next_cursor': self.next_cursor,
+            'page_size': self.page_size,
+        }
@@ -0,0 +1,81 @@
+"""
+EXPLAIN checks for the hot procurement queries.
+
+Each entry of ``_hot_queries()`` is a representative queryset plus the table that must be read
+through an index lookup. ``check_query_plans`` runs EXPLAIN for each one and reports a full scan
+of that table as a failure; the ``check_query_plans`` management command wraps it for CI/deploys.
+
+MySQL: a scan is ``type`` ALL (table) or index (whole index). It only fails when ``possible_keys``
+is empty too, because on small tables the optimizer may pick a scan even though a usable index
+exists (that is a warning).
+SQLite: any ``SCAN <table>`` step is a full scan, including an ordered walk of an index.
+"""
+import uuid
+
+from django.db import connection
+from django.utils.timezone import now
+
+
+def _hot_queries():
+    from bids.models import Bid, BidDocument
+    from notifications.models import Notification
+    from users.models import EntityUser
+    from .models import Tender
+
+    some_uuid = uuid.uuid4()
+    return [
+        ('open tenders', 'tenders_tender',
+         Tender.objects.filter(status='published', closing_date__gt=now())),
+        ('tenders by status, newest first', 'tenders_tender',
+         Tender.objects.filter(status='draft').order_by('-created_at')),
+        ('bids of a tender by status', 'bids_bid',
+         Bid.objects.filter(tender_id=some_uuid, status='submitted')),
+        ("a supplier's bids, newest first", 'bids_bid',
+         Bid.objects.filter(supplier_id=0).order_by('-created_at')),
+        ('unread notifications of a user', 'notifications_notification',
+         Notification.objects.filter(user_id=0, is_read=False).order_by('-created_at')),
+        ('entity permission check', 'users_entityuser',
+         EntityUser.objects.filter(user_id=0, entity_id=0, status='active')),
+        ("a user's active entity roles", 'users_entityuser',
+         EntityUser.objects.filter(user_id=0, status='active')),
+        ('bid documents by type', 'bids_biddocument',
+         BidDocument.objects.filter(bid_id=0, document_type='tax_clearance')),
+    ]
+
+
+def _explain_rows(qs):
+    sql, params = qs.query.sql_with_params()
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [c[0].lower() for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _verdict(rows, table):
+    """Return ('ok' | 'warn' | 'fail', plan summary) for the rows reading ``table``."""
+    if connection.vendor == 'sqlite':
+        details = [r['detail'] for r in rows]
+        # "SCAN t USING INDEX i" still walks every row (just in index order); only SEARCH is a lookup
+        scanned = [d for d in details if d.startswith(f'SCAN {table}')]
+        return ('fail' if scanned else 'ok'), '; '.join(details)
+
+    if connection.vendor == 'mysql':
+        mine = [r for r in rows if r.get('table') == table]
+        summary = '; '.join(f"type={r.get('type')} key={r.get('key')} rows={r.get('rows')}" for r in mine)
+        scans = [r for r in mine if r.get('type') in ('ALL', 'index')]
+        if any(not r.get('possible_keys') for r in scans):
+            return 'fail', summary
+        if scans:
+            return 'warn', summary
+        return 'ok', summary
+
+    return 'ok', f'not checked on {connection.vendor}'
+
+
+def check_query_plans() -> list[dict]:
+    results = []
+    for name, table, qs in _hot_queries():
+        verdict, plan = _verdict(_explain_rows(qs), table)
+        results.append({'name': name, 'table': table, 'verdict': verdict, 'plan': plan})
+    return results
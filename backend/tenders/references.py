@@ -0,0 +1,84 @@
+"""
+Tender reference number allocation.
+
+References look like ``TND-<year>-<ENTITY>-<00001>`` and come from a per-entity, per-year
+TenderReferenceSequence row. Numbers are claimed with SELECT ... FOR UPDATE on that row:
+
+- Outside a transaction, a block of ``TENDER_REFERENCE_BLOCK_SIZE`` numbers is reserved and
+  committed at once, then handed out from process memory, so most allocations touch no row lock.
+- Inside a transaction (atomic block), exactly the requested numbers are claimed in it, so a
+  rollback returns them and nothing stale is cached.
+
+Numbers lost to crashes or failed creates leave gaps; references are unique, not contiguous.
+"""
+import re
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+DEFAULT_BLOCK_SIZE = 20
+
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+def entity_prefix(entity) -> str:
+    code = re.sub(r'[^A-Za-z0-9]', '', entity.code or '').upper()
+    return code or f'PE{entity.pk}'
+
+
+def format_reference(entity, year: int, number: int) -> str:
+    return f"TND-{year}-{entity_prefix(entity)}-{number:05d}"
+
+
+def _claim(entity_id, year, count) -> int:
+    """Advance the sequence by ``count`` and return the first claimed number."""
+    from .models import TenderReferenceSequence
+    with transaction.atomic():
+        TenderReferenceSequence.objects.get_or_create(procuring_entity_id=entity_id, year=year)
+        seq = TenderReferenceSequence.objects.select_for_update().get(procuring_entity_id=entity_id, year=year)
+        start = seq.last_value + 1
+        seq.last_value += count
+        seq.save(update_fields=['last_value', 'updated_at'])
+    return start
+
+
+def _allocate_numbers(entity_id, year, count) -> list[int]:
+    if connection.in_atomic_block:
+        start = _claim(entity_id, year, count)
+        return list(range(start, start + count))
+
+    block_size = max(getattr(settings, 'TENDER_REFERENCE_BLOCK_SIZE', DEFAULT_BLOCK_SIZE), 1)
+    key = (entity_id, year)
+    out = []
+    with _blocks_lock:
+        nxt, end = _blocks.get(key, (1, 0))
+        while len(out) < count:
+            if nxt > end:
+                size = max(block_size, count - len(out))
+                nxt = _claim(entity_id, year, size)
+                end = nxt + size - 1
+            take = min(end - nxt + 1, count - len(out))
+            out.extend(range(nxt, nxt + take))
+            nxt += take
+        _blocks[key] = (nxt, end)
+    return out
+
+
+def allocate_reference_numbers(entity, count: int = 1, year: int = None) -> list[str]:
+    """Return ``count`` unused tender references for ``entity`` (bulk imports ask for many at once)."""
+    from .models import Tender
+    year = year or now().year
+    refs = []
+    while len(refs) < count:
+        candidates = [format_reference(entity, year, n) for n in _allocate_numbers(entity.pk, year, count - len(refs))]
+        # Skip any reference already entered by hand
+        taken = set(Tender.objects.filter(reference_number__in=candidates).values_list('reference_number', flat=True))
+        refs.extend(c for c in candidates if c not in taken)
+    return refs
+
+
+def allocate_reference_number(entity, year: int = None) -> str:
+    return allocate_reference_numbers(entity, 1, year=year)[0]
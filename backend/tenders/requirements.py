@@ -0,0 +1,51 @@
+"""
+Cached upload requirements (TenderUploadDocuments) per tender.
+
+Bid document uploads check every file against its tender's requirement map, so the map is kept
+under ``tender_upload_requirements:<tender id>`` in the cache alias named by
+``settings.TENDER_REQUIREMENTS_CACHE_ALIAS``. tenders.signals drops the entry when a requirement of
+that tender is saved or deleted. That delete has to reach every worker, so the alias must be a
+shared backend (file based or Redis), not local memory.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import TenderUploadDocuments
+
+DEFAULT_TIMEOUT = 3600
+
+
+@dataclass(frozen=True)
+class UploadRequirement:
+    id: int
+    name: str
+    file_type: str
+    max_file_size: int
+    mandatory: bool
+
+
+def get_cache():
+    return caches[getattr(settings, 'TENDER_REQUIREMENTS_CACHE_ALIAS', 'default')]
+
+
+def _cache_key(tender_id) -> str:
+    return f"tender_upload_requirements:{tender_id}"
+
+
+def upload_requirements(tender_id) -> dict[str, UploadRequirement]:
+    """Map of file_type -> requirement for the tender, in definition order."""
+    cache = get_cache()
+    key = _cache_key(tender_id)
+    requirements = cache.get(key)
+    if requirements is None:
+        rows = (TenderUploadDocuments.objects.filter(tender_id=tender_id).order_by('id')
+                .values_list('id', 'name', 'file_type', 'max_file_size', 'mandatory'))
+        requirements = {row[2]: UploadRequirement(*row) for row in rows}
+        cache.set(key, requirements, timeout=getattr(settings, 'TENDER_REQUIREMENTS_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return requirements
+
+
+def invalidate_upload_requirements(tender_id):
+    get_cache().delete(_cache_key(tender_id))
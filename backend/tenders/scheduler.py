@@ -0,0 +1,138 @@
+"""
+Closing-date transitions for published tenders.
+
+``close_due_tenders`` moves published tenders whose closing_date has passed to
+``settings.TENDER_CLOSE_STATUS`` (``evaluation`` by default) in batches, each batch in one
+transaction with a bulk UPDATE and bulk-created notifications. The ``run_tender_scheduler``
+management command keeps a due-time heap of the tenders closing soon and sleeps until the next
+one is due.
+
+Queryset updates bypass model signals, so each batch adjusts the dashboard counters itself and the
+public tender feed cache is invalidated once after the run.
+"""
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now, localtime
+
+from .cache import invalidate_public_feed
+from .counters import COUNTER_RULES
+from .models import Tender, DashboardCounters
+
+DEFAULT_CLOSE_STATUS = 'evaluation'
+DEFAULT_BATCH_SIZE = 200
+
+
+def close_status() -> str:
+    target = getattr(settings, 'TENDER_CLOSE_STATUS', DEFAULT_CLOSE_STATUS)
+    if target not in Tender.TRANSITION_MAP['published']:
+        raise ValueError(f"TENDER_CLOSE_STATUS must be one of {Tender.TRANSITION_MAP['published']}")
+    return target
+
+
+def _notifications(tenders, target):
+    from bids.models import Bid
+    from notifications.models import Notification
+
+    by_id = {t['id']: t for t in tenders}
+    out = []
+    for t in tenders:
+        out.append(Notification(
+            user_id=t['created_by_id'],
+            title=f"Tender {t['reference_number']} has closed",
+            message=f"Bidding for \"{t['title']}\" closed on {localtime(t['closing_date']):%Y-%m-%d %H:%M} and the tender "
+                    f"moved to {target}.",
+            notification_type='tender_closed',
+            related_id=t['id'],
+            related_type='tender',
+            priority='high',
+        ))
+    bidders = (
+        Bid.objects.filter(tender_id__in=by_id).exclude(status='draft')
+        .values_list('tender_id', 'supplier_id').distinct()
+    )
+    for tender_id, supplier_id in bidders:
+        t = by_id[tender_id]
+        out.append(Notification(
+            user_id=supplier_id,
+            title=f"Tender {t['reference_number']} has closed",
+            message=f"Bidding for \"{t['title']}\" has closed to new bids; submitted bids can no longer be changed.",
+            notification_type='tender_closed',
+            related_id=t['id'],
+            related_type='tender',
+        ))
+    return out
+
+
+def _close_batch(ids, at, target) -> int:
+    from notifications.models import Notification
+
+    with transaction.atomic():
+        # Re-check under lock: the deadline may have been extended since the ids were picked
+        tenders = list(
+            Tender.objects.select_for_update()
+            .filter(pk__in=ids, status='published', closing_date__lte=at)
+            .values('id', 'reference_number', 'title', 'closing_date', 'created_by_id')
+        )
+        if not tenders:
+            return 0
+        closed = Tender.objects.filter(pk__in=[t['id'] for t in tenders]).update(
+            status=target, tender_stage='evaluation', updated_at=now()
+        )
+        _, _, counted = COUNTER_RULES['active_tenders']
+        delta = int(target in counted) - int('published' in counted)
+        if delta:
+            DashboardCounters.objects.filter(pk=1).update(active_tenders=F('active_tenders') + delta * closed)
+        Notification.objects.bulk_create(_notifications(tenders, target), batch_size=500)
+    return closed
+
+
+def close_due_tenders(at=None, ids=None, batch_size=None) -> int:
+    """Transition every published tender closing at or before ``at`` (optionally only ``ids``). Returns the count."""
+    at = at or now()
+    batch_size = batch_size or getattr(settings, 'TENDER_CLOSE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    target = close_status()
+    due = Tender.objects.filter(status='published', closing_date__lte=at)
+    if ids is not None:
+        due = due.filter(pk__in=list(ids))
+    due_ids = list(due.order_by('closing_date').values_list('id', flat=True))
+
+    total = 0
+    for start in range(0, len(due_ids), batch_size):
+        total += _close_batch(due_ids[start:start + batch_size], at, target)
+    if total:
+        invalidate_public_feed()
+    return total
+
+
+class ClosingSchedule:
+    """Min-heap of (closing_date, tender id) for published tenders closing within ``horizon``."""
+
+    def __init__(self, horizon: timedelta):
+        self.horizon = horizon
+        self._heap = []
+
+    def refresh(self, at=None):
+        # Rebuilt from the (status, closing_date) index so extended or withdrawn deadlines drop out
+        at = at or now()
+        self._heap = list(
+            Tender.objects.filter(status='published', closing_date__lte=at + self.horizon)
+            .order_by().values_list('closing_date', 'id')
+        )
+        heapq.heapify(self._heap)
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, at=None) -> list:
+        at = at or now()
+        ids = []
+        while self._heap and self._heap[0][0] <= at:
+            ids.append(heapq.heappop(self._heap)[1])
+        return ids
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,252 @@
+"""
+Tender search index.
+
+Every Tender has a TenderSearchDocument holding its searchable text, refreshed on save.
+Queries are answered by one of two backends:
+
+- ``mysql``: InnoDB FULLTEXT indexes queried in BOOLEAN MODE (every term required, prefix matched).
+- ``memory``: an in-process inverted index built from the search documents; used for SQLite/tests.
+
+The backend is chosen from ``settings.TENDER_SEARCH_BACKEND`` ('mysql' | 'memory'), defaulting
+to the vendor of the default database connection.
+"""
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, IntegerField
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TITLE_WEIGHT = 3.0
+DEFAULT_MAX_RESULTS = 500
+CANDIDATE_CHUNK_SIZE = 500
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if len(t) > 1 or t.isdigit()]
+
+
+def build_document_fields(tender) -> dict:
+    """Return the searchable fields for a tender (title part is weighted higher when ranking)."""
+    title = ' '.join(filter(None, [tender.title, tender.reference_number]))
+    body = ' '.join(filter(None, [
+        tender.description,
+        getattr(tender.procuring_entity, 'name', ''),
+        getattr(tender.category, 'name', ''),
+        getattr(tender.subcategory, 'name', '') if tender.subcategory_id else '',
+    ]))
+    return {'title': title, 'body': body}
+
+
+class InMemorySearchBackend:
+    """Inverted index (term -> {tender_id: weighted tf}) with prefix lookups over a sorted vocabulary."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._vocabulary = []
+
+    def _load(self):
+        from .models import TenderSearchDocument
+        with self._lock:
+            if self._loaded:
+                return
+            for tender_id, title, body in TenderSearchDocument.objects.values_list('tender_id', 'title', 'body').iterator():
+                self._add(str(tender_id), title, body)
+            self._vocabulary = sorted(self._postings)
+            self._loaded = True
+
+    def _add(self, tender_id, title, body):
+        weights = defaultdict(float)
+        for term in tokenize(title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(body):
+            weights[term] += 1.0
+        for term, w in weights.items():
+            self._postings[term][tender_id] = w
+        self._doc_terms[tender_id] = set(weights)
+
+    def _remove(self, tender_id):
+        for term in self._doc_terms.pop(tender_id, ()):
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.pop(tender_id, None)
+                if not docs:
+                    del self._postings[term]
+
+    def update(self, tender_id, title, body):
+        with self._lock:
+            if not self._loaded:
+                # Will be picked up from the database on first query
+                return
+            tender_id = str(tender_id)
+            self._remove(tender_id)
+            self._add(tender_id, title, body)
+            self._vocabulary = sorted(self._postings)
+
+    def remove(self, tender_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(str(tender_id))
+            self._vocabulary = sorted(self._postings)
+
+    def reset(self):
+        with self._lock:
+            self._loaded = False
+            self._postings = defaultdict(dict)
+            self._doc_terms = {}
+            self._vocabulary = []
+
+    def _expand(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, terms: list[str], limit: int, candidates=None) -> list[str]:
+        self._load()
+        with self._lock:
+            n_docs = max(len(self._doc_terms), 1)
+            scores = None
+            for prefix in terms:
+                matched = defaultdict(float)
+                for term in self._expand(prefix):
+                    docs = self._postings[term]
+                    idf = math.log(1 + n_docs / len(docs))
+                    for tender_id, w in docs.items():
+                        matched[tender_id] += w * idf
+                if scores is None:
+                    scores = matched
+                else:
+                    # Every term is required
+                    scores = {tid: s + matched[tid] for tid, s in scores.items() if tid in matched}
+                if not scores:
+                    return []
+        ranked = [tid for tid, _ in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))]
+        if candidates is None:
+            return ranked[:limit]
+        # Walk the ranking in slices, keeping the ids the caller's queryset allows, until the page is full
+        out = []
+        candidates = candidates.order_by()
+        for start in range(0, len(ranked), CANDIDATE_CHUNK_SIZE):
+            chunk = ranked[start:start + CANDIDATE_CHUNK_SIZE]
+            allowed = {str(pk) for pk in candidates.filter(pk__in=chunk).values_list('pk', flat=True)}
+            out.extend(tid for tid in chunk if tid in allowed)
+            if len(out) >= limit:
+                break
+        return out[:limit]
+
+
+class MySQLFulltextSearchBackend:
+    """Queries the FULLTEXT indexes created by the tenders search migration."""
+
+    def update(self, tender_id, title, body):
+        pass
+
+    def remove(self, tender_id):
+        pass
+
+    def reset(self):
+        pass
+
+    def search(self, terms: list[str], limit: int, candidates=None) -> list[str]:
+        from .models import TenderSearchDocument
+        table = connection.ops.quote_name(TenderSearchDocument._meta.db_table)
+        boolean_query = ' '.join(f'+{t}*' for t in terms)
+        # The caller's filters go into the same statement, so LIMIT applies to the filtered matches
+        restrict, restrict_params = '', []
+        if candidates is not None:
+            subquery, restrict_params = candidates.order_by().values('pk').query.sql_with_params()
+            restrict = f"AND tender_id IN ({subquery}) "
+        sql = (
+            f"SELECT tender_id, "
+            f"MATCH(title) AGAINST (%s IN BOOLEAN MODE) * {TITLE_WEIGHT} "
+            f"+ MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AS relevance "
+            f"FROM {table} "
+            f"WHERE MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) "
+            f"{restrict}"
+            f"ORDER BY relevance DESC LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [boolean_query, boolean_query, boolean_query, *restrict_params, limit])
+            return [str(row[0]) for row in cursor.fetchall()]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'TENDER_SEARCH_BACKEND', None) or (
+                    'mysql' if connection.vendor == 'mysql' else 'memory'
+                )
+                _backend = MySQLFulltextSearchBackend() if name == 'mysql' else InMemorySearchBackend()
+    return _backend
+
+
+def index_tender(tender):
+    """Create or refresh the search document for a tender."""
+    from .models import TenderSearchDocument
+    fields = build_document_fields(tender)
+    TenderSearchDocument.objects.update_or_create(tender_id=tender.pk, defaults=fields)
+    backend = get_backend()
+    transaction.on_commit(lambda: backend.update(tender.pk, fields['title'], fields['body']))
+
+
+def unindex_tender(tender_id):
+    backend = get_backend()
+    transaction.on_commit(lambda: backend.remove(tender_id))
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Recreate every search document. Returns the number of tenders indexed."""
+    from .models import Tender, TenderSearchDocument
+    count = 0
+    batch = []
+    qs = Tender.objects.select_related('procuring_entity', 'category', 'subcategory').order_by('pk')
+    for tender in qs.iterator(chunk_size=batch_size):
+        batch.append(TenderSearchDocument(tender_id=tender.pk, **build_document_fields(tender)))
+        if len(batch) >= batch_size:
+            TenderSearchDocument.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=['tender'], update_fields=['title', 'body']
+            )
+            count += len(batch)
+            batch = []
+    if batch:
+        TenderSearchDocument.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=['tender'], update_fields=['title', 'body']
+        )
+        count += len(batch)
+    get_backend().reset()
+    return count
+
+
+def search_tenders(qs, query: str, limit: int = None):
+    """Restrict a Tender queryset to documents matching ``query``, ordered by relevance.
+
+    The backend ranks only tenders that ``qs`` allows, so ``limit`` counts filtered matches.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return qs.none()
+    limit = limit or getattr(settings, 'TENDER_SEARCH_MAX_RESULTS', DEFAULT_MAX_RESULTS)
+    ids = get_backend().search(terms, limit, candidates=qs)
+    if not ids:
+        return qs.none()
+    ordering = Case(
+        *[When(pk=pk, then=Value(pos)) for pos, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return qs.filter(pk__in=ids).annotate(search_rank=ordering).order_by('search_rank')
@@ -1,9 +1,11 @@
 from datetime import datetime
+from decimal import ROUND_HALF_UP
 from django.utils.timezone import make_aware, now
 from django.db import transaction
 from rest_framework import serializers
 
 from .models import Tender, Category, TenderUploadDocuments
+from .references import allocate_reference_number
 from users.models import EntityUser, ProcuringEntity
 
 
@@ -121,19 +123,6 @@ class TenderCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError('No procuring entity linked to the current user.')
         return link.entity
 
-    def _generate_reference_number(self) -> str:
-        # Simple generator: TDR-YYYYMMDD-HHMMSS-<count>
-        dt = now()
-        base = dt.strftime('TDR-%Y%m%d-%H%M%S')
-        suffix = Tender.objects.count() + 1
-        candidate = f"{base}-{suffix:04d}"
-        # Ensure uniqueness
-        while Tender.objects.filter(reference_number=candidate).exists():
-            suffix += 1
-            candidate = f"{base}-{suffix:04d}"
-        return candidate
-
-    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get('request')
         user = getattr(request, 'user', None)
@@ -148,19 +137,21 @@ class TenderCreateSerializer(serializers.Serializer):
         subcategory = Category.objects.get(id=subcategory_id) if subcategory_id else None
         procuring_entity = self._resolve_procuring_entity(user, procuring_entity_id)
 
-        reference_number = validated_data.pop('reference_number', '') or self._generate_reference_number()
-
-        tender = Tender.objects.create(
-            category=category,
-            subcategory=subcategory,
-            procuring_entity=procuring_entity,
-            created_by=user,
-            status='draft',  # Start as draft
-            tender_stage='preparation',
-            reference_number=reference_number,
-            publication_date=now(),
-            **validated_data,
-        )
+        # Allocated before the transaction so the sequence row lock is not held while creating
+        reference_number = validated_data.pop('reference_number', '') or allocate_reference_number(procuring_entity)
+
+        with transaction.atomic():
+            tender = Tender.objects.create(
+                category=category,
+                subcategory=subcategory,
+                procuring_entity=procuring_entity,
+                created_by=user,
+                status='draft',  # Start as draft
+                tender_stage='preparation',
+                reference_number=reference_number,
+                publication_date=now(),
+                **validated_data,
+            )
         return tender
 
 
@@ -198,6 +189,33 @@ class TenderUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
+class ScoreField(serializers.DecimalField):
+    """0-100 score with two decimal places; longer input (computed averages) is rounded half up
+    instead of rejected."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('allow_null', True)
+        super().__init__(max_digits=5, decimal_places=2, min_value=0, max_value=100, rounding=ROUND_HALF_UP, **kwargs)
+
+    def validate_precision(self, value):
+        # Range first: quantizing to five digits fails outright on values of 1000 and up
+        if value > self.max_value:
+            self.fail('max_value', max_value=self.max_value)
+        if value < self.min_value:
+            self.fail('min_value', min_value=self.min_value)
+        return super().validate_precision(self.quantize(value))
+
+
+class EvaluationSummaryRowSerializer(serializers.Serializer):
+    """One row of the evaluation summary sent with a recommendation."""
+    id = serializers.UUIDField()
+    techScore = ScoreField()
+    financialScore = ScoreField()
+    combinedScore = ScoreField()
+    rank = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+
+
 class TenderUploadDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = TenderUploadDocuments
@@ -245,6 +263,10 @@ class TenderListSerializer(serializers.ModelSerializer):
         ]
 
     def get_total_bids(self, obj):
+        # Prefer the Count('bids') annotation from list views to avoid a query per row
+        annotated = getattr(obj, 'bid_count', None)
+        if annotated is not None:
+            return annotated
         try:
             return obj.bids.count()
         except Exception:
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from users.models import ProcuringEntity
+from .models import Tender, Category, TenderUploadDocuments
+from .search import index_tender, unindex_tender
+from .cache import invalidate_public_feed
+from .categories import invalidate_category_tree
+from .requirements import invalidate_upload_requirements
+from .counters import counted_models, remember_counted_values, apply_counter_changes
+
+
+@receiver(post_save, sender=Tender)
+def refresh_tender_search_document(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_tender(instance)
+
+
+@receiver(post_delete, sender=Tender)
+def drop_tender_search_document(sender, instance, **kwargs):
+    unindex_tender(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_search_documents(sender, instance, created=False, raw=False, **kwargs):
+    # Category names are part of the indexed body text
+    if raw or created:
+        return
+    qs = (
+        Tender.objects
+        .filter(Q(category=instance) | Q(subcategory=instance))
+        .select_related('procuring_entity', 'category', 'subcategory')
+    )
+    for tender in qs.iterator():
+        index_tender(tender)
+
+
+@receiver(post_save, sender=ProcuringEntity)
+def refresh_entity_search_documents(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    qs = instance.tenders.select_related('procuring_entity', 'category', 'subcategory')
+    for tender in qs.iterator():
+        index_tender(tender)
+
+
+@receiver([post_save, post_delete], sender=Tender)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=ProcuringEntity)
+def invalidate_public_tender_feed(sender, **kwargs):
+    invalidate_public_feed()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def refresh_category_tree(sender, **kwargs):
+    # After commit, so a subtree move is complete before any process reloads the tree
+    transaction.on_commit(invalidate_category_tree)
+
+
+@receiver([post_save, post_delete], sender=TenderUploadDocuments)
+def refresh_upload_requirements(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tender_id = instance.tender_id
+    invalidate_upload_requirements(tender_id)
+    # Again after commit, in case a concurrent request cached the old rows in between
+    transaction.on_commit(lambda: invalidate_upload_requirements(tender_id))
+
+
+def remember_dashboard_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    remember_counted_values(instance, update_fields=update_fields)
+
+
+def update_dashboard_counters(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    apply_counter_changes(instance, update_fields=update_fields)
+
+
+def decrement_dashboard_counters(sender, instance, **kwargs):
+    apply_counter_changes(instance, deleted=True)
+
+
+def connect_dashboard_counters():
+    for model in counted_models():
+        uid = f'dashboard_counters_{model._meta.label_lower}'
+        pre_save.connect(remember_dashboard_values, sender=model, dispatch_uid=uid)
+        post_save.connect(update_dashboard_counters, sender=model, dispatch_uid=uid)
+        post_delete.connect(decrement_dashboard_counters, sender=model, dispatch_uid=uid)
@@ -0,0 +1,36 @@
+"""
+File staging for tender creation.
+
+Attachments are written to document storage before the database transaction opens, so slow
+uploads never hold row locks. Each save takes a reference on its (content-addressed) blob; if the
+transaction fails the staged files are released again.
+"""
+import logging
+
+from .models import Tender, TenderDocument
+
+logger = logging.getLogger(__name__)
+
+
+def stage_tender_files(tender_id, uploaded_files) -> list[str]:
+    """Write each uploaded file to storage (streamed in chunks) and return the stored names, in order."""
+    field = TenderDocument._meta.get_field('file')
+    placeholder = TenderDocument(tender=Tender(id=tender_id))
+    staged = []
+    try:
+        for uploaded_file in uploaded_files:
+            name = field.generate_filename(placeholder, uploaded_file.name)
+            staged.append(field.storage.save(name, uploaded_file, max_length=field.max_length))
+    except Exception:
+        discard_staged_files(staged)
+        raise
+    return staged
+
+
+def discard_staged_files(names):
+    storage = TenderDocument._meta.get_field('file').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Could not remove staged tender file %s", name)
@@ -1,3 +1,142 @@
+import base64
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from django.utils.timezone import localdate, now
+from rest_framework.test import APIClient
+
+from bids.models import Bid, BidEvaluation, EvaluationCommittee
+from bids.tests import create_supplier, create_tender
+
+from .analytics import build_procurement_rollups, live_procurement_metrics, rollup_metrics
+from .categories import category_subtree_ids, get_category_tree
+from .models import Category, ProcurementDailyRollup, Tender
+from .query_plans import check_query_plans
+from .search import get_backend, search_tenders
+
+
+@skipUnless(connection.vendor in ('mysql', 'sqlite'), "EXPLAIN output is only checked on MySQL and SQLite")
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_an_index(self):
+        results = check_query_plans()
+        self.assertTrue(results)
+        failed = [f"{r['name']} ({r['table']}): {r['plan']}" for r in results if r['verdict'] == 'fail']
+        self.assertEqual(failed, [], "Hot queries fell back to a full table scan")
+
+
+class EvaluationRecommendationTests(TestCase):
+    def setUp(self):
+        self.tender = create_tender()
+        self.bids = [Bid.objects.create(tender=self.tender, supplier=create_supplier(n), total_bid_amount=1000 + n,
+                                        bid_validity_days=90) for n in range(2)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.tender.created_by)
+        self.url = f'/tenders/{self.tender.id}/evaluation/recommendation/'
+
+    def test_valid_summary_is_saved(self):
+        response = self.client.post(self.url, {'summary': [
+            {'id': str(self.bids[0].id), 'techScore': 80.125, 'financialScore': 90, 'combinedScore': 84.005, 'rank': 1},
+            {'id': str(self.bids[1].id), 'techScore': 70, 'combinedScore': 70, 'rank': 2},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['top_recommendation']['bid_id'], str(self.bids[0].id))
+        first = Bid.objects.get(pk=self.bids[0].pk)
+        self.assertEqual((str(first.technical_score), str(first.total_score), first.ranking), ('80.13', '84.01', 1))
+
+    def test_out_of_range_rows_are_reported_by_index_without_writes(self):
+        response = self.client.post(self.url, {'summary': [
+            {'id': str(self.bids[0].id), 'techScore': 80, 'combinedScore': 80, 'rank': 1},
+            {'id': str(self.bids[1].id), 'techScore': 1000, 'financialScore': '123456', 'combinedScore': 1e30},
+            {'id': str(self.bids[1].id), 'techScore': -1, 'rank': 0},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'invalid_summary')
+        errors = {e['index']: e['errors'] for e in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertEqual(sorted(errors[1]), ['combinedScore', 'financialScore', 'techScore'])
+        self.assertEqual(errors[1]['techScore'][0].code, 'max_value')
+        self.assertEqual(sorted(errors[2]), ['rank', 'techScore'])
+        self.assertFalse(Bid.objects.filter(tender=self.tender, ranking__isnull=False).exists())
+        self.assertFalse(Bid.objects.filter(tender=self.tender, technical_score__isnull=False).exists())
+
+
+class CategoryTreeCacheTests(TestCase):
+    def test_change_made_by_another_process_is_picked_up(self):
+        medical = Category.objects.create(name='Medical Supplies', code='MED')
+        gloves = Category.objects.create(name='Gloves', code='GLV', parent=medical)
+        self.assertEqual(category_subtree_ids('Medical Supplies'), {medical.id, gloves.id})
+
+        # Writes through the queryset skip this process's signals, like a write in another worker
+        Category.objects.filter(pk=gloves.pk).update(name='Surgical Gloves', updated_at=now())
+        self.assertEqual(get_category_tree().nodes[gloves.id]['name'], 'Surgical Gloves')
+        Category.objects.filter(pk=gloves.pk).delete()
+        self.assertEqual(category_subtree_ids('Medical Supplies'), {medical.id})
+
+    def test_unchanged_tree_is_not_reloaded(self):
+        Category.objects.create(name='Medical Supplies', code='MED')
+        get_category_tree()
+        with self.assertNumQueries(1):
+            get_category_tree()
+
+
+class TenderSearchTests(TestCase):
+    def test_limit_applies_after_the_callers_filters(self):
+        for n in range(5):
+            draft = create_tender(reference=f'MOH-2026-{n:03d}')
+            draft.status = 'draft'
+            draft.title = 'Gloves, gloves and more gloves'  # outranks the published tender
+            draft.save()
+        published = create_tender(reference='MOH-2026-100')
+        get_backend().reset()
+
+        # More drafts than the limit rank above the published tender
+        self.assertEqual(search_tenders(Tender.objects.all(), 'gloves', limit=2).filter(pk=published.pk).count(), 0)
+        self.assertEqual(list(search_tenders(Tender.objects.filter(status='published'), 'gloves', limit=2)),
+                         [published])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.tenders = [create_tender(reference=f'MOH-2026-{n:03d}') for n in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenders[0].created_by)
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get('/tenders/', {'paginate': 'cursor', 'page_size': 2}).data
+        second = self.client.get('/tenders/', {'cursor': first['next_cursor'], 'page_size': 2}).data
+        ids = [t['id'] for t in first['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted(str(t.id) for t in self.tenders))
+        self.assertIsNone(second['next_cursor'])
+
+    def test_malformed_cursors_are_rejected(self):
+        for raw in ('2026-01-01T00:00:00+00:00|not-a-uuid', '2026-13-45T00:00:00|' + str(self.tenders[0].id),
+                    'no separator'):
+            cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+            response = self.client.get('/tenders/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, raw)
+        self.assertEqual(self.client.get('/tenders/', {'cursor': '%%%'}).status_code, 400)
+
+
+class ProcurementRollupTests(TestCase):
+    def test_partial_rebuild_picks_up_late_evaluations_of_older_tenders(self):
+        closed = [create_tender(reference=f'MOH-2026-{n:03d}') for n in range(2)]
+        Tender.objects.filter(pk__in=[t.pk for t in closed]).update(closing_date=now() - timedelta(days=10))
+        bid = Bid.objects.create(tender=closed[0], supplier=create_supplier(), total_bid_amount=1000,
+                                 bid_validity_days=90)
+        build_procurement_rollups()
+        self.assertEqual(rollup_metrics(ProcurementDailyRollup.objects.all())['average_evaluation_time_days'], None)
+
+        # Evaluated today, long after closing; a nightly run only covers the last two days
+        committee = EvaluationCommittee.objects.create(tender=closed[0], committee_name='Committee',
+                                                       chairperson=closed[0].created_by, appointment_date=now().date())
+        BidEvaluation.objects.create(bid=bid, evaluator=closed[0].created_by, committee=committee)
+        build_procurement_rollups(since=localdate() - timedelta(days=2))
 
-# Create your tests here.
+        rolled_up = rollup_metrics(ProcurementDailyRollup.objects.all())
+        live = live_procurement_metrics()
+        self.assertEqual(rolled_up['average_evaluation_time_days'], live['average_evaluation_time_days'])
+        self.assertEqual(rolled_up['average_bid_count_per_tender'], live['average_bid_count_per_tender'])
+        # The rebuilt day still counts both tenders that closed on it
+        self.assertEqual(sum(ProcurementDailyRollup.objects.values_list('tender_count', flat=True)), 2)
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import CategoryListCreateView, TenderListCreateView, create_tender, DashboardView, tender_detail, \
     tender_bids, submit_evaluation_recommendation, update_tender, evaluation_committee, evaluation_summary, \
-    evaluation_overview, procurement_analytics, public_tenders, public_tender_detail
+    evaluation_overview, procurement_analytics, public_tenders, public_tender_detail, \
+    category_tree, tenders_ready_for_evaluation
 
 urlpatterns = [
     path('', TenderListCreateView.as_view(), name='tenders_list_create'),
@@ -13,8 +14,10 @@ urlpatterns = [
     path('<uuid:tender_id>/evaluation/summary/', evaluation_summary, name='evaluation_summary'),
     path('create/', create_tender, name='create_tender'),
     path('categories/', CategoryListCreateView.as_view(), name='categories_list_create'),
+    path('categories/tree/', category_tree, name='category_tree'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('evaluation/overview/', evaluation_overview, name='evaluation_overview'),
+    path('evaluation/ready/', tenders_ready_for_evaluation, name='tenders_ready_for_evaluation'),
     path('procurement/analytics/', procurement_analytics, name='procurement_analytics'),
     path('public/', public_tenders, name='public-tenders'),
     path('public/<uuid:tender_id>/', public_tender_detail, name='public-tender-detail'),
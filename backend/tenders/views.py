@@ -1,12 +1,13 @@
 import json
 import uuid
+from datetime import timedelta
 
 from django.db import transaction, models
 from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_protect
 from django.utils.decorators import method_decorator
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Count
+from django.db.models import Count, Q
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -14,10 +15,21 @@ from rest_framework import status
 
 from django.shortcuts import get_object_or_404
 from bids.models import Contract, Bid, EvaluationCommittee, CommitteeMember
-from users.models import ProcuringEntity
+from users.models import ProcuringEntity, EntityUser
 from django.contrib.auth import get_user_model
-from .models import Category, Tender, TenderUploadDocuments, TenderDocument
-from .serializer import TenderCreateSerializer, CategorySerializer, TenderListSerializer, TenderUpdateSerializer, TenderDetailSerializer
+from .models import Category, Tender, TenderUploadDocuments, TenderDocument, ProcurementDailyRollup
+from .serializer import TenderCreateSerializer, CategorySerializer, TenderListSerializer, TenderUpdateSerializer, TenderDetailSerializer, \
+    EvaluationSummaryRowSerializer
+from .pagination import KeysetPagination, InvalidCursor
+from .search import search_tenders
+from .categories import get_category_tree, category_subtree_ids
+from .cache import feed_cache_key, get_cached_feed, store_feed
+from .readiness import evaluation_readiness
+from .analytics import live_procurement_metrics, rollup_metrics, contract_duration_stats
+from .counters import read_dashboard_counters
+from .references import allocate_reference_number
+from .staging import stage_tender_files, discard_staged_files
+from .etags import make_etag, etag_matches, not_modified, with_etag, tender_version_parts
 from rest_framework.parsers import JSONParser
 
 
@@ -25,103 +37,117 @@ from rest_framework.parsers import JSONParser
 @permission_classes([IsAuthenticated])
 def create_tender(request):
     try:
-        with transaction.atomic():  # Ensure all operations succeed or none do
-            # Parse the main tender data
-            tender_data_str = request.data.get('tender_data')
-            if not tender_data_str:
-                return Response(
-                    {'error': 'tender_data is required'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        # Parse the main tender data
+        tender_data_str = request.data.get('tender_data')
+        if not tender_data_str:
+            return Response(
+                {'error': 'tender_data is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            tender_data = json.loads(tender_data_str)
+        tender_data = json.loads(tender_data_str)
 
-            # Generate reference number (you might want a more sophisticated system)
-            reference_number = f"TND-{now().year}-{str(uuid.uuid4())[:8].upper()}"
+        # Validate foreign key relationships
+        try:
+            category = Category.objects.get(id=tender_data['category'])
+            procuring_entity = ProcuringEntity.objects.get(id=tender_data['procuring_entity'])
+            subcategory = None
+            if tender_data.get('subcategory'):
+                subcategory = Category.objects.get(id=tender_data['subcategory'])
+        except (Category.DoesNotExist, ProcuringEntity.DoesNotExist):
+            return Response(
+                {'error': 'Invalid category or procuring entity'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            # Validate foreign key relationships
-            try:
-                category = Category.objects.get(id=tender_data['category'])
-                procuring_entity = ProcuringEntity.objects.get(id=tender_data['procuring_entity'])
-                subcategory = None
-                if tender_data.get('subcategory'):
-                    subcategory = Category.objects.get(id=tender_data['subcategory'])
-            except (Category.DoesNotExist, ProcuringEntity.DoesNotExist):
-                return Response(
-                    {'error': 'Invalid category or procuring entity'},
-                    status=status.HTTP_400_BAD_REQUEST
+        # Parse the upload requirements and document metadata before anything is written
+        tender_id = uuid.uuid4()
+        upload_requirements_str = request.data.get('upload_document_requirements')
+        upload_requirements = json.loads(upload_requirements_str) if upload_requirements_str else []
+        requirement_rows = [
+            TenderUploadDocuments(
+                tender_id=tender_id,
+                name=req_data['name'],
+                file_type=req_data['file_type'],
+                max_file_size=req_data['max_file_size'],
+                mandatory=req_data['mandatory']
+            )
+            for req_data in upload_requirements
+        ]
+
+        document_count = int(request.data.get('document_count', 0))
+        documents = []
+        for i, uploaded_file in enumerate(request.FILES.getlist('document_files')):
+            if i < document_count:
+                metadata_str = request.data.get(f'document_metadata_{i}')
+                if metadata_str:
+                    documents.append((uploaded_file, json.loads(metadata_str)))
+
+        # Allocate the reference before the transaction so the sequence row is not locked for its duration
+        reference_number = allocate_reference_number(procuring_entity)
+
+        # Write the files to storage outside the transaction; they are removed again if it fails
+        staged_names = stage_tender_files(tender_id, [f for f, _ in documents])
+        document_rows = [
+            TenderDocument(
+                tender_id=tender_id,
+                document_name=metadata.get('document_name', uploaded_file.name),
+                document_type=metadata.get('document_type', 'other'),
+                file=name,
+                file_size=uploaded_file.size,
+                mime_type=uploaded_file.content_type or '',
+                is_mandatory=metadata.get('is_mandatory', False),
+                version=metadata.get('version', '1.0'),
+                uploaded_by=request.user
+            )
+            for (uploaded_file, metadata), name in zip(documents, staged_names)
+        ]
+
+        try:
+            with transaction.atomic():  # Ensure all operations succeed or none do
+                # Create the main tender object
+                tender = Tender.objects.create(
+                    id=tender_id,
+                    reference_number=reference_number,
+                    title=tender_data['title'],
+                    description=tender_data['description'],
+                    category=category,
+                    subcategory=subcategory,
+                    procuring_entity=procuring_entity,
+                    procurement_method=tender_data['procurement_method'],
+                    estimated_value=tender_data.get('estimated_value'),
+                    currency=tender_data.get('currency', 'ZMW'),
+                    closing_date=tender_data['closing_date'],
+                    opening_date=tender_data.get('opening_date'),
+                    bid_validity_period=tender_data.get('bid_validity_period', 90),
+                    minimum_requirements=tender_data.get('minimum_requirements', ''),
+                    technical_specifications=tender_data.get('technical_specifications', ''),
+                    evaluation_criteria=tender_data.get('evaluation_criteria', ''),
+                    terms_conditions=tender_data.get('terms_conditions', ''),
+                    tender_security_required=tender_data.get('tender_security_required', False),
+                    tender_security_amount=tender_data.get('tender_security_amount'),
+                    tender_security_type=tender_data.get('tender_security_type'),
+                    allow_variant_bids=tender_data.get('allow_variant_bids', False),
+                    allow_electronic_submission=tender_data.get('allow_electronic_submission', True),
+                    auto_extend_on_amendment=tender_data.get('auto_extend_on_amendment', True),
+                    status=tender_data.get('status', 'draft'),
+                    created_by=request.user
                 )
 
-            # Create the main tender object
-            tender = Tender.objects.create(
-                reference_number=reference_number,
-                title=tender_data['title'],
-                description=tender_data['description'],
-                category=category,
-                subcategory=subcategory,
-                procuring_entity=procuring_entity,
-                procurement_method=tender_data['procurement_method'],
-                estimated_value=tender_data.get('estimated_value'),
-                currency=tender_data.get('currency', 'ZMW'),
-                closing_date=tender_data['closing_date'],
-                opening_date=tender_data.get('opening_date'),
-                bid_validity_period=tender_data.get('bid_validity_period', 90),
-                minimum_requirements=tender_data.get('minimum_requirements', ''),
-                technical_specifications=tender_data.get('technical_specifications', ''),
-                evaluation_criteria=tender_data.get('evaluation_criteria', ''),
-                terms_conditions=tender_data.get('terms_conditions', ''),
-                tender_security_required=tender_data.get('tender_security_required', False),
-                tender_security_amount=tender_data.get('tender_security_amount'),
-                tender_security_type=tender_data.get('tender_security_type'),
-                allow_variant_bids=tender_data.get('allow_variant_bids', False),
-                allow_electronic_submission=tender_data.get('allow_electronic_submission', True),
-                auto_extend_on_amendment=tender_data.get('auto_extend_on_amendment', True),
-                status=tender_data.get('status', 'draft'),
-                created_by=request.user
-            )
+                # Create document upload requirements and attached documents
+                TenderUploadDocuments.objects.bulk_create(requirement_rows)
+                TenderDocument.objects.bulk_create(document_rows)
+        except Exception:
+            discard_staged_files(staged_names)
+            raise
 
-            # Create document upload requirements
-            upload_requirements_str = request.data.get('upload_document_requirements')
-            if upload_requirements_str:
-                upload_requirements = json.loads(upload_requirements_str)
-                for req_data in upload_requirements:
-                    TenderUploadDocuments.objects.create(
-                        tender=tender,
-                        name=req_data['name'],
-                        file_type=req_data['file_type'],
-                        max_file_size=req_data['max_file_size'],
-                        mandatory=req_data['mandatory']
-                    )
-
-            # Handle uploaded documents
-            document_count = int(request.data.get('document_count', 0))
-            uploaded_files = request.FILES.getlist('document_files')
-
-            for i, uploaded_file in enumerate(uploaded_files):
-                if i < document_count:
-                    metadata_str = request.data.get(f'document_metadata_{i}')
-                    if metadata_str:
-                        metadata = json.loads(metadata_str)
-
-                        TenderDocument.objects.create(
-                            tender=tender,
-                            document_name=metadata.get('document_name', uploaded_file.name),
-                            document_type=metadata.get('document_type', 'other'),
-                            file=uploaded_file,
-                            file_size=uploaded_file.size,
-                            mime_type=uploaded_file.content_type or '',
-                            is_mandatory=metadata.get('is_mandatory', False),
-                            version=metadata.get('version', '1.0'),
-                            uploaded_by=request.user
-                        )
-
-            # Return success response
-            return Response({
-                'id': str(tender.id),
-                'reference_number': tender.reference_number,
-                'message': 'Tender created successfully',
-                'status': tender.status
-            }, status=status.HTTP_201_CREATED)
+        # Return success response
+        return Response({
+            'id': str(tender.id),
+            'reference_number': tender.reference_number,
+            'message': 'Tender created successfully',
+            'status': tender.status
+        }, status=status.HTTP_201_CREATED)
 
     except json.JSONDecodeError:
         return Response(
@@ -139,7 +165,20 @@ class TenderListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = Tender.objects.all().order_by('-created_at')
+        qs = (
+            Tender.objects
+            .select_related('procuring_entity', 'category', 'subcategory')
+            .annotate(bid_count=Count('bids'))
+            .order_by('-created_at')
+        )
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination(request)
+            try:
+                page = paginator.paginate_queryset(qs)
+            except InvalidCursor:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            serializer = TenderListSerializer(page, many=True)
+            return Response(paginator.get_paginated_payload(serializer.data))
         serializer = TenderListSerializer(qs, many=True)
         return Response(serializer.data)
 
@@ -168,13 +207,18 @@ def tender_detail(request, tender_id):
         tender = (
             Tender.objects
             .select_related('procuring_entity', 'category', 'subcategory', 'created_by')
+            .prefetch_related('upload_documents')
             .get(id=tender_id)
         )
     except Tender.DoesNotExist:
         return Response({'error': 'Tender not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    etag = make_etag(*tender_version_parts(tender))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     data = TenderDetailSerializer(tender).data
-    return Response(data, status=status.HTTP_200_OK)
+    return with_etag(Response(data, status=status.HTTP_200_OK), etag)
 
 
 @api_view(['PATCH', 'PUT'])
@@ -215,7 +259,7 @@ class CategoryListCreateView(APIView):
     def get(self, request):
         # Optional filtering: parent_id to fetch subcategories
         parent_id = request.query_params.get('parent_id')
-        qs = Category.objects.all().order_by('name')
+        qs = Category.objects.select_related('parent').order_by('name')
         if parent_id is not None:
             if parent_id == "":
                 qs = qs.filter(parent__isnull=True)
@@ -230,28 +274,32 @@ class CategoryListCreateView(APIView):
             category = serializer.save()
             return Response(CategorySerializer(category).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def category_tree(request):
+    """The whole category tree as nested nodes, served from the in-process tree cache."""
+    return Response(get_category_tree().as_nested())
+
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request):
-        active_tenders = Tender.objects.filter(status__in=['draft','published']).count()
-        pending_eval = Tender.objects.filter(status__in=['draft','published']).count()  # adjust to your workflow
-        active_contracts = Contract.objects.filter(status='active').count()
-        UserModel = get_user_model()
-        total_suppliers = UserModel.objects.filter(user_type='supplier').count()
+        # Totals come from the pre-aggregated counters row (see tenders.counters)
+        counters = read_dashboard_counters()
+        active_tenders = counters.active_tenders
+        pending_eval = counters.active_tenders  # adjust to your workflow
+        active_contracts = counters.active_contracts
+        total_suppliers = counters.total_suppliers
+        pending_suppliers = counters.pending_suppliers
 
         recent_tenders_qs = (
             Tender.objects.order_by('-created_at')
             .values('reference_number', 'title', 'status','id')[:3]
         )
 
-        # Pending actions: include pending supplier verifications
-        try:
-            from users.models import SupplierProfile as SP
-            pending_suppliers = SP.objects.filter(verification_status='pending').count()
-        except Exception:
-            pending_suppliers = 0
-
         pending_actions = []
         if pending_suppliers:
             pending_actions.append({
@@ -299,44 +347,74 @@ def submit_evaluation_recommendation(request, tender_id):
     """
     Accepts evaluation details and summary rows; updates Bid scores and rankings.
     Body: { evaluation: {...}, summary: [{id, techScore, financialScore, combinedScore, rank}] }
+    The whole summary is validated first; if any row is invalid nothing is saved and every
+    row's errors are returned together.
     """
     tender = get_object_or_404(Tender, id=tender_id)
     data = request.data or {}
     summary = data.get('summary') or []
+    if not isinstance(summary, list):
+        return Response({'error': 'summary must be a list', 'code': 'invalid_summary'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    rows, errors = [], []
+    for index, row in enumerate(summary):
+        serializer = EvaluationSummaryRowSerializer(data=row)
+        if serializer.is_valid():
+            rows.append((index, serializer.validated_data))
+        else:
+            row_id = row.get('id') if isinstance(row, dict) else None
+            errors.append({'index': index, 'id': row_id, 'errors': serializer.errors})
+
+    # One query for every referenced bid of this tender, suppliers included for the recommendation
+    bid_map = {
+        b.id: b
+        for b in Bid.objects.filter(tender=tender, id__in=[r['id'] for _, r in rows]).select_related('supplier')
+    }
+    seen = set()
+    for index, row in rows:
+        if row['id'] not in bid_map:
+            errors.append({'index': index, 'id': str(row['id']), 'errors': {'id': ['Bid not found for this tender.']}})
+        elif row['id'] in seen:
+            errors.append({'index': index, 'id': str(row['id']), 'errors': {'id': ['Bid listed more than once.']}})
+        seen.add(row['id'])
+    if errors:
+        errors.sort(key=lambda e: e['index'])
+        return Response({'error': 'Invalid evaluation summary', 'code': 'invalid_summary', 'errors': errors},
+                        status=status.HTTP_400_BAD_REQUEST)
 
-    # Validate bid IDs belong to tender
-    bid_map = {str(b.id): b for b in Bid.objects.filter(tender=tender)}
     updated = []
     top = None
-    for row in summary:
-        bid_id = str(row.get('id'))
-        bid = bid_map.get(bid_id)
-        if not bid:
-            continue
-        # Update scores and ranking
-        tech = row.get('techScore')
-        fin = row.get('financialScore')
-        total = row.get('combinedScore')
-        rank = row.get('rank')
-        if tech is not None:
-            bid.technical_score = tech
-        if fin is not None:
-            bid.financial_score = fin
-        if total is not None:
-            bid.total_score = total
-        if rank is not None:
-            bid.ranking = rank
-        # Optionally update status for winner only; do minimal changes
-        bid.save()
-        updated.append(str(bid.id))
-        if rank == 1 and top is None:
+    stamp = now()
+    for _, row in rows:
+        bid = bid_map[row['id']]
+        # Fields left out of a row keep their stored value
+        if row.get('techScore') is not None:
+            bid.technical_score = row['techScore']
+        if row.get('financialScore') is not None:
+            bid.financial_score = row['financialScore']
+        if row.get('combinedScore') is not None:
+            bid.total_score = row['combinedScore']
+        if row.get('rank') is not None:
+            bid.ranking = row['rank']
+        bid.updated_at = stamp
+        updated.append(bid)
+        if row.get('rank') == 1 and top is None:
             top = {
                 'bid_id': str(bid.id),
                 'bidder_name': getattr(bid.supplier, 'full_name', None) or getattr(bid.supplier, 'name', None) or bid.supplier.get_username(),
-                'combinedScore': total,
+                'combinedScore': row.get('combinedScore'),
             }
 
-    return Response({'message': 'Evaluation recommendation recorded', 'updated_bids': updated, 'top_recommendation': top})
+    with transaction.atomic():
+        Bid.objects.bulk_update(
+            updated, ['technical_score', 'financial_score', 'total_score', 'ranking', 'updated_at'], batch_size=500)
+
+    return Response({
+        'message': 'Evaluation recommendation recorded',
+        'updated_bids': [str(bid.id) for bid in updated],
+        'top_recommendation': top,
+    })
 
 
 
@@ -466,38 +544,87 @@ def evaluation_overview(request):
     - pending_evaluations: tenders currently in evaluation stage
     - completed_this_month: contracts created this calendar month
     - avg_days_to_complete: average days from tender creation to contract creation
+    - p50_days_to_complete / p90_days_to_complete: percentiles of the same duration
+
+    Optional ?group_by=entity,month adds a 'breakdown' list per procuring entity and/or month.
+    All figures are computed in the database; no Contract objects are loaded.
     """
-    from django.utils.timezone import now
-    from django.db.models import F
     today = now().date()
     first_day = today.replace(day=1)
 
     # Pending: tenders at evaluation stage (fallback: closed but not awarded)
-    pending_qs = Tender.objects.filter(tender_stage='evaluation')
-    if not pending_qs.exists():
-        pending_qs = Tender.objects.filter(status__in=['closed']).exclude(contract__isnull=False)
-
-    pending_evaluations = pending_qs.count()
+    pending = Tender.objects.aggregate(
+        evaluation=Count('id', filter=Q(tender_stage='evaluation')),
+        closed_without_contract=Count('id', filter=Q(status='closed', contract__isnull=True)),
+    )
+    pending_evaluations = pending['evaluation'] or pending['closed_without_contract']
 
     # Completed this month: contracts created this month
-    contracts_this_month = Contract.objects.filter(created_at__date__gte=first_day, created_at__date__lte=today)
-    completed_this_month = contracts_this_month.count()
-
-    # Average days to complete: across all contracts, from tender.created_at to contract.created_at
-    from django.db.models.functions import ExtractDay
-    durations = []
-    for c in Contract.objects.select_related('tender').all():
-        t_created = getattr(c.tender, 'created_at', None)
-        c_created = getattr(c, 'created_at', None)
-        if t_created and c_created:
-            durations.append((c_created - t_created).days)
-    avg_days_to_complete = round(sum(durations) / len(durations), 1) if durations else 0.0
+    completed_this_month = Contract.objects.filter(
+        created_at__date__gte=first_day, created_at__date__lte=today
+    ).count()
 
-    return Response({
+    # Average/percentile days to complete: across all contracts, from tender.created_at to contract.created_at
+    overall = (contract_duration_stats() or [{}])[0]
+    out = {
         'pending_evaluations': pending_evaluations,
         'completed_this_month': completed_this_month,
-        'avg_days_to_complete': avg_days_to_complete,
-    })
+        'avg_days_to_complete': overall.get('avg_days_to_complete', 0.0),
+        'p50_days_to_complete': overall.get('p50_days_to_complete'),
+        'p90_days_to_complete': overall.get('p90_days_to_complete'),
+    }
+
+    group_by = [g.strip() for g in (request.query_params.get('group_by') or '').split(',') if g.strip()]
+    if group_by:
+        out['breakdown'] = contract_duration_stats(group_by=group_by)
+    return Response(out)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tenders_ready_for_evaluation(request):
+    """Tenders whose bidding has closed, with their evaluation readiness.
+
+    Only tenders that are ready are listed unless ?include_not_ready=true, in which case each
+    entry also says what is missing. Readiness for the whole page costs three grouped queries
+    (see tenders.readiness).
+    """
+    user = request.user
+    qs = (
+        Tender.objects
+        .filter(Q(status='evaluation') | Q(status='published', closing_date__lte=now()))
+        .select_related('procuring_entity')
+        .annotate(bid_count=Count('bids', filter=~Q(bids__status='draft')))
+        .order_by('closing_date')
+    )
+    if not user.is_superuser:
+        entity_ids = EntityUser.objects.filter(user=user, status='active').values('entity_id')
+        committee_tenders = CommitteeMember.objects.filter(user=user).values('committee__tender_id')
+        qs = qs.filter(
+            Q(created_by=user) | Q(procuring_entity_id__in=entity_ids) | Q(pk__in=committee_tenders)
+        )
+
+    include_not_ready = str(request.query_params.get('include_not_ready', '')).lower() in ('1', 'true', 'yes')
+    tenders = list(qs)
+    readiness = evaluation_readiness(tenders)
+
+    out = []
+    for tender in tenders:
+        info = readiness[tender.pk]
+        if not info['ready'] and not include_not_ready:
+            continue
+        out.append({
+            'id': str(tender.id),
+            'reference_number': tender.reference_number,
+            'title': tender.title,
+            'procuring_entity': tender.procuring_entity.name,
+            'status': tender.status,
+            'closing_date': tender.closing_date.isoformat(),
+            'bid_count': tender.bid_count,
+            'evaluation_ready': info['ready'],
+            'missing': info['missing'],
+        })
+    return Response(out)
+
 
 from rest_framework.parsers import JSONParser
 
@@ -511,27 +638,34 @@ def public_tenders(request):
     Return published tenders for public viewing.
     Only includes published tenders that are still accepting bids.
     """
-    # Only show published tenders
+    # Optional filtering
+    category = request.query_params.get('category')
+    category_id = request.query_params.get('category_id')
+    search = request.query_params.get('search')
+
+    cache_key = feed_cache_key('list', category=category, category_id=category_id, search=search)
+    cached = get_cached_feed(cache_key)
+    if cached is not None:
+        return Response(cached)
+
+    # Only show published tenders that have not closed yet
     qs = (
         Tender.objects
-        .filter(status='published')
+        .filter(status='published', closing_date__gt=now())
         .select_related('procuring_entity', 'category', 'subcategory')
         .order_by('-created_at')
     )
 
-    # Optional filtering
-    category = request.query_params.get('category')
-    search = request.query_params.get('search')
-
     if category:
         qs = qs.filter(category__name__icontains=category)
 
+    if category_id:
+        # The category and everything below it
+        subtree = category_subtree_ids(category_id)
+        qs = qs.filter(Q(category_id__in=subtree) | Q(subcategory_id__in=subtree))
+
     if search:
-        qs = qs.filter(
-            models.Q(title__icontains=search) |
-            models.Q(reference_number__icontains=search) |
-            models.Q(procuring_entity__name__icontains=search)
-        )
+        qs = search_tenders(qs, search)
 
     # Serialize with limited fields for public view
     data = []
@@ -562,7 +696,10 @@ def public_tenders(request):
             'allow_electronic_submission': tender.allow_electronic_submission,
         })
 
-    return Response({'results': data, 'count': len(data)})
+    payload = {'results': data, 'count': len(data)}
+    # Expire no later than the first listed tender closes so it drops out on time
+    store_feed(cache_key, payload, expires_at=min((t.closing_date for t in qs), default=None))
+    return Response(payload)
 
 
 @api_view(['GET'])
@@ -576,6 +713,13 @@ def public_tender_detail(request, tender_id):
     except ValueError:
         return Response({'error': 'Invalid tender ID format'}, status=status.HTTP_400_BAD_REQUEST)
 
+    cache_key = feed_cache_key('detail', tender_id=str(tender_id))
+    cached = get_cached_feed(cache_key)
+    if cached is not None:
+        if etag_matches(request, cached['etag']):
+            return not_modified(cached['etag'])
+        return with_etag(Response(cached['data'], status=status.HTTP_200_OK), cached['etag'], private=False)
+
     try:
         tender = (
             Tender.objects
@@ -586,6 +730,11 @@ def public_tender_detail(request, tender_id):
     except Tender.DoesNotExist:
         return Response({'error': 'Published tender not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    # is_open/days_remaining are time-derived, so they are part of the version
+    etag = make_etag(*tender_version_parts(tender, include_uploads=False), tender.is_open, tender.days_remaining)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     # Return detailed public data
     data = {
         'id': str(tender.id),
@@ -616,7 +765,13 @@ def public_tender_detail(request, tender_id):
         'days_remaining': tender.days_remaining,
     }
 
-    return Response(data, status=status.HTTP_200_OK)
+    # is_open flips at closing_date and days_remaining ticks over every 24h before that
+    expires_at = None
+    if tender.is_open:
+        remaining = (tender.closing_date - now()).total_seconds()
+        expires_at = now() + timedelta(seconds=remaining % 86400 or 86400)
+    store_feed(cache_key, {'etag': etag, 'data': data}, expires_at=expires_at)
+    return with_etag(Response(data, status=status.HTTP_200_OK), etag, private=False)
 
 # Procurement analytics endpoint
 @api_view(['GET'])
@@ -625,43 +780,33 @@ def procurement_analytics(request):
     """Return basic procurement analytics metrics.
     - average_bid_count_per_tender: average number of bids per tender across all tenders
     - average_evaluation_time_days: average days from tender closing_date to the last evaluation entry per tender
+
+    Figures are read from ProcurementDailyRollup (filled nightly by build_procurement_rollups).
+    Optional query params: date_from, date_to (closing date range), procuring_entity, category,
+    interval=day|month to include a time series, group_by=entity|category to split the series.
+    Falls back to a live grouped query until the rollup has been built.
     """
     try:
-        tenders_qs = Tender.objects.all()
-        total_tenders = tenders_qs.count()
-
-        # Average bid count per tender
-        if total_tenders:
-            bid_counts = list(
-                tenders_qs.annotate(c=Count('bids')).values_list('c', flat=True)
-            )
-            avg_bid_count = round(sum(bid_counts) / total_tenders, 2)
-        else:
-            avg_bid_count = 0.0
-
-        # Average evaluation time (days) from closing_date to last evaluation date
-        from bids.models import BidEvaluation
-        eval_durations = []
-        if total_tenders:
-            for t in tenders_qs.only('id', 'closing_date'):
-                if not t.closing_date:
-                    continue
-                last_eval_dt = (
-                    BidEvaluation.objects.filter(bid__tender=t)
-                    .order_by('-evaluation_date')
-                    .values_list('evaluation_date', flat=True)
-                    .first()
-                )
-                if last_eval_dt:
-                    delta = last_eval_dt - t.closing_date
-                    days = delta.total_seconds() / 86400.0
-                    # include even if negative; but clamp at 0 for reporting sanity
-                    eval_durations.append(days if days >= 0 else 0)
-        avg_eval_days = round(sum(eval_durations) / len(eval_durations), 2) if eval_durations else None
-
-        return Response({
-            'average_bid_count_per_tender': avg_bid_count,
-            'average_evaluation_time_days': avg_eval_days,
-        })
+        rollups = ProcurementDailyRollup.objects.all()
+        params = request.query_params
+        if params.get('date_from'):
+            rollups = rollups.filter(date__gte=params['date_from'])
+        if params.get('date_to'):
+            rollups = rollups.filter(date__lte=params['date_to'])
+        if params.get('procuring_entity'):
+            rollups = rollups.filter(procuring_entity_id=params['procuring_entity'])
+        if params.get('category'):
+            rollups = rollups.filter(category_id=params['category'])
+
+        last_built = ProcurementDailyRollup.objects.aggregate(at=models.Max('computed_at'))['at']
+        if last_built is None:
+            out = live_procurement_metrics()
+            out['source'] = 'live'
+            return Response(out)
+
+        out = rollup_metrics(rollups, interval=params.get('interval'), group_by=params.get('group_by'))
+        out['source'] = 'rollup'
+        out['computed_at'] = last_built
+        return Response(out)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+from uploads.models import UploadSession, StoredBlob
+
+# Register your models here.
+admin.site.register(UploadSession)
+admin.site.register(StoredBlob)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class UploadsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'uploads'
+
+    def ready(self):
+        from . import signals
+        signals.connect_document_blob_release()
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from uploads.storage import document_storage
+
+
+class Command(BaseCommand):
+    help = "Garbage-collect unreferenced document blobs (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconcile', action='store_true',
+                            help="Recount blob references from the document tables first.")
+        parser.add_argument('--grace-hours', type=int,
+                            help="Only remove blobs unreferenced for this long (default DOCUMENT_BLOB_GC_GRACE_HOURS).")
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            corrected = document_storage.reconcile_references()
+            self.stdout.write(f"Corrected reference counts on {corrected} blob(s).")
+        grace = timedelta(hours=options['grace_hours']) if options.get('grace_hours') is not None else None
+        removed = document_storage.collect_garbage(grace=grace)
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} unreferenced file(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from uploads.services import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Remove expired, unfinished chunked uploads and their partial files (run from cron)."
+
+    def handle(self, *args, **options):
+        count = purge_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} expired upload(s)."))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('bids', '0005_bid_bids_bid_tender__446e9d_idx_and_more'),
+        ('tenders', '0012_tender_tenders_ten_status_9589ca_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('bid_document', 'Bid Document'), ('tender_document', 'Tender Document')], max_length=20)),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('total_size', models.PositiveBigIntegerField(help_text='Declared file size in bytes')),
+                ('received_bytes', models.PositiveBigIntegerField(default=0)),
+                ('checksum_sha256', models.CharField(blank=True, help_text='Expected SHA-256 of the whole file', max_length=64)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('completed', 'Completed'), ('aborted', 'Aborted')], default='uploading', max_length=10)),
+                ('document_id', models.CharField(blank=True, help_text='Id of the document created on completion', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+                ('bid', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='bids.bid')),
+                ('tender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='tenders.tender')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='uploads_upl_status_818213_idx')],
+            },
+        ),
+    ]
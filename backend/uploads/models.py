@@ -0,0 +1,79 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload that becomes a BidDocument or TenderDocument when completed"""
+    TARGET_BID_DOCUMENT = 'bid_document'
+    TARGET_TENDER_DOCUMENT = 'tender_document'
+    TARGET_CHOICES = [
+        (TARGET_BID_DOCUMENT, 'Bid Document'),
+        (TARGET_TENDER_DOCUMENT, 'Tender Document'),
+    ]
+
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETED = 'completed'
+    STATUS_ABORTED = 'aborted'
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_ABORTED, 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    bid = models.ForeignKey('bids.Bid', null=True, blank=True, on_delete=models.CASCADE, related_name='upload_sessions')
+    tender = models.ForeignKey('tenders.Tender', null=True, blank=True, on_delete=models.CASCADE,
+                               related_name='upload_sessions')
+
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField(help_text="Declared file size in bytes")
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    checksum_sha256 = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 of the whole file")
+    # Target-specific fields for the document row (document_type, document_name, is_mandatory, version)
+    metadata = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    document_id = models.CharField(max_length=64, blank=True, help_text="Id of the document created on completion")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size}, {self.status})"
+
+    @property
+    def part_path(self) -> str:
+        """Where received bytes are appended until the upload completes."""
+        from .services import upload_dir
+        return os.path.join(upload_dir(), f"{self.id}.part")
+
+
+class StoredBlob(models.Model):
+    """One unique file body in the content-addressed document storage (uploads.storage)"""
+    name = models.CharField(max_length=100, unique=True, help_text="Storage name, blobs/<aa>/<bb>/<sha256><ext>")
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    # Live references (document rows and in-flight saves); 0 means collectable after the grace period
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_referenced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'last_referenced_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
@@ -0,0 +1,317 @@
+"""
+Resumable chunked uploads.
+
+A session is started with the file's name and size, then the client PUTs chunks at increasing
+offsets. Each chunk is streamed straight into ``<CHUNKED_UPLOAD_DIR>/<session id>.part`` at its
+offset, so nothing is held in memory and the file never needs assembling. An interrupted client
+asks for the session, reads ``received_bytes`` and resumes from there. On completion the whole
+file is checked against its SHA-256. It is then moved into document storage (a rename into the
+content-addressed store, reusing that hash) and only then does the BidDocument or TenderDocument
+row appear.
+"""
+import errno
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import UploadSession
+from .storage import ContentAddressedStorage
+
+DEFAULT_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_EXPIRY_HOURS = 24
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, code, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, 'code': code, **extra}
+
+
+def upload_dir() -> str:
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', None) or os.path.join(settings.MEDIA_ROOT, '.chunked')
+
+
+def max_chunk_size() -> int:
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_CHUNK_SIZE', DEFAULT_MAX_CHUNK_SIZE)
+
+
+def _expiry():
+    return now() + timedelta(hours=getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', DEFAULT_EXPIRY_HOURS))
+
+
+def session_payload(session: UploadSession) -> dict:
+    return {
+        'id': str(session.id),
+        'target': session.target,
+        'filename': session.filename,
+        'status': session.status,
+        'total_size': session.total_size,
+        'received_bytes': session.received_bytes,
+        'max_chunk_size': max_chunk_size(),
+        'expires_at': session.expires_at.isoformat(),
+        'document_id': session.document_id or None,
+    }
+
+
+def _bid_document_metadata(user, data, size):
+    from bids.models import Bid
+    from tenders.requirements import upload_requirements
+    bid = Bid.objects.filter(id=data.get('bid_id'), supplier=user).first()
+    if bid is None:
+        raise UploadError('Bid not found', 'not_found', status=404)
+    provided_type = data.get('document_type')
+    doc_type = provided_type or 'other'
+    tender_reqs = upload_requirements(bid.tender_id)
+    cfg = tender_reqs.get(doc_type)
+    # Same rules as BidDocumentUploadView
+    if provided_type and not cfg:
+        raise UploadError(f"Invalid document_type '{provided_type}' for this tender.", 'invalid_document_type',
+                          allowed_types=list(tender_reqs.keys()))
+    if cfg and cfg.max_file_size and size > int(cfg.max_file_size):
+        raise UploadError(f"File exceeds maximum size for {cfg.name} ({cfg.max_file_size} bytes)", 'file_too_large',
+                          limit=int(cfg.max_file_size), actual=size)
+    metadata = {
+        'document_type': doc_type,
+        'document_name': cfg.name if cfg else None,
+        'is_required': bool(cfg and cfg.mandatory),
+    }
+    return {'bid': bid}, metadata
+
+
+def _tender_document_metadata(user, data, size):
+    from tenders.models import Tender, TenderDocument
+    from users.models import EntityUser
+    tender = Tender.objects.filter(id=data.get('tender_id')).first()
+    if tender is None:
+        raise UploadError('Tender not found', 'not_found', status=404)
+    if not (user.is_superuser or user.id == tender.created_by_id or EntityUser.objects.filter(
+            user=user, entity_id=tender.procuring_entity_id, status='active').exists()):
+        raise UploadError('Not authorized to add documents to this tender.', 'forbidden', status=403)
+    doc_type = data.get('document_type') or 'other'
+    if doc_type not in dict(TenderDocument.DOCUMENT_TYPES):
+        raise UploadError(f"Invalid document_type '{doc_type}'.", 'invalid_document_type',
+                          allowed_types=[c for c, _ in TenderDocument.DOCUMENT_TYPES])
+    metadata = {
+        'document_type': doc_type,
+        'document_name': data.get('document_name') or None,
+        'is_mandatory': bool(data.get('is_mandatory', False)),
+        'version': str(data.get('version') or '1.0'),
+    }
+    return {'tender': tender}, metadata
+
+
+def start_upload(user, data) -> UploadSession:
+    filename = os.path.basename(str(data.get('filename') or '')).strip()
+    if not filename:
+        raise UploadError('filename is required', 'invalid')
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        size = -1
+    if size <= 0:
+        raise UploadError('size must be a positive number of bytes', 'invalid')
+
+    target = data.get('target')
+    if target == UploadSession.TARGET_BID_DOCUMENT:
+        owner, metadata = _bid_document_metadata(user, data, size)
+    elif target == UploadSession.TARGET_TENDER_DOCUMENT:
+        owner, metadata = _tender_document_metadata(user, data, size)
+    else:
+        raise UploadError('target must be one of bid_document, tender_document', 'invalid')
+
+    session = UploadSession.objects.create(
+        user=user,
+        target=target,
+        filename=filename,
+        content_type=str(data.get('content_type') or '')[:100],
+        total_size=size,
+        checksum_sha256=str(data.get('checksum') or '').lower(),
+        metadata=metadata,
+        expires_at=_expiry(),
+        **owner,
+    )
+    os.makedirs(upload_dir(), exist_ok=True)
+    open(session.part_path, 'wb').close()
+    return session
+
+
+def _locked_session(session_id, user) -> UploadSession:
+    session = UploadSession.objects.select_for_update().filter(id=session_id, user=user).first()
+    if session is None:
+        raise UploadError('Upload not found', 'not_found', status=404)
+    return session
+
+
+def get_session(session_id, user) -> UploadSession:
+    session = UploadSession.objects.filter(id=session_id, user=user).first()
+    if session is None:
+        raise UploadError('Upload not found', 'not_found', status=404)
+    return session
+
+
+def write_chunk(session_id, user, offset: int, stream, checksum: str = None) -> UploadSession:
+    """Append one chunk read from ``stream`` at ``offset``; the offset must equal ``received_bytes``."""
+    with transaction.atomic():
+        session = _locked_session(session_id, user)
+        if session.status != UploadSession.STATUS_UPLOADING:
+            raise UploadError(f'Upload is {session.status}', 'not_uploading', status=409)
+        if offset != session.received_bytes:
+            raise UploadError('Chunk offset does not match the bytes received so far', 'offset_mismatch',
+                              status=409, received_bytes=session.received_bytes)
+
+        limit = min(max_chunk_size(), session.total_size - session.received_bytes)
+        hasher = hashlib.sha256() if checksum else None
+        written = 0
+        with open(session.part_path, 'r+b') as fh:
+            fh.seek(offset)
+            while True:
+                piece = stream.read(READ_SIZE)
+                if not piece:
+                    break
+                written += len(piece)
+                if written > limit:
+                    fh.truncate(offset)
+                    raise UploadError('Chunk is larger than allowed', 'chunk_too_large', status=413, limit=limit)
+                fh.write(piece)
+                if hasher:
+                    hasher.update(piece)
+            if not written:
+                raise UploadError('Empty chunk', 'empty_chunk')
+            if hasher and hasher.hexdigest() != checksum.lower():
+                fh.truncate(offset)
+                raise UploadError('Chunk checksum mismatch', 'checksum_mismatch', received_bytes=offset)
+
+        session.received_bytes = offset + written
+        session.expires_at = _expiry()
+        session.save(update_fields=['received_bytes', 'expires_at', 'updated_at'])
+    return session
+
+
+def _sha256_of(path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for piece in iter(lambda: fh.read(READ_SIZE * 16), b''):
+            hasher.update(piece)
+    return hasher.hexdigest()
+
+
+def store_file(storage, name: str, path: str, digest: str = None) -> str:
+    """Move the file at ``path`` into ``storage`` under ``name`` (or a free variant) and return the stored name.
+
+    The content-addressed document storage adopts it under its already computed ``digest``; other
+    local filesystem storage gets a rename, so the bytes are not copied; other backends stream it.
+    """
+    if digest and isinstance(storage, ContentAddressedStorage):
+        return storage.adopt(path, digest, os.path.getsize(path), original_name=name)
+    if isinstance(storage, FileSystemStorage):
+        name = storage.get_available_name(name)
+        target = storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(path, target)
+            if storage.file_permissions_mode is not None:
+                os.chmod(target, storage.file_permissions_mode)
+            return name
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+    with open(path, 'rb') as fh:
+        name = storage.save(name, File(fh))
+    os.remove(path)
+    return name
+
+
+def _build_document(session: UploadSession):
+    meta = session.metadata or {}
+    if session.target == UploadSession.TARGET_BID_DOCUMENT:
+        from bids.models import BidDocument
+        return BidDocument(
+            bid=session.bid,
+            document_name=meta.get('document_name') or session.filename,
+            document_type=meta.get('document_type', 'other'),
+            file_size=session.total_size,
+            mime_type=session.content_type,
+            is_required=meta.get('is_required', False),
+        )
+    from tenders.models import TenderDocument
+    return TenderDocument(
+        tender=session.tender,
+        document_name=meta.get('document_name') or session.filename,
+        document_type=meta.get('document_type', 'other'),
+        file_size=session.total_size,
+        mime_type=session.content_type,
+        is_mandatory=meta.get('is_mandatory', False),
+        version=meta.get('version', '1.0'),
+        uploaded_by=session.user,
+    )
+
+
+def complete_upload(session_id, user, checksum: str = None) -> UploadSession:
+    """Verify the received file and attach it as a document. Completing twice returns the same session."""
+    with transaction.atomic():
+        session = _locked_session(session_id, user)
+        if session.status == UploadSession.STATUS_COMPLETED:
+            return session
+        if session.status != UploadSession.STATUS_UPLOADING:
+            raise UploadError(f'Upload is {session.status}', 'not_uploading', status=409)
+        if session.received_bytes != session.total_size:
+            raise UploadError('Upload is incomplete', 'incomplete', status=409,
+                              received_bytes=session.received_bytes, total_size=session.total_size)
+
+        # Drop any bytes past the acknowledged length (a chunk whose bookkeeping failed)
+        with open(session.part_path, 'r+b') as fh:
+            fh.truncate(session.received_bytes)
+        expected = (checksum or session.checksum_sha256 or '').lower()
+        digest = _sha256_of(session.part_path)
+        if expected and digest != expected:
+            raise UploadError('File checksum mismatch', 'checksum_mismatch', expected=expected, actual=digest)
+
+        document = _build_document(session)
+        field = document._meta.get_field('file')
+        stored = store_file(field.storage, field.generate_filename(document, session.filename), session.part_path,
+                            digest=digest)
+        document.file.name = stored
+        try:
+            document.save()
+            session.status = UploadSession.STATUS_COMPLETED
+            session.checksum_sha256 = digest
+            session.document_id = str(document.pk)
+            session.save(update_fields=['status', 'checksum_sha256', 'document_id', 'updated_at'])
+        except Exception:
+            field.storage.delete(stored)
+            raise
+    return session
+
+
+def abort_upload(session_id, user) -> UploadSession:
+    with transaction.atomic():
+        session = _locked_session(session_id, user)
+        if session.status == UploadSession.STATUS_UPLOADING:
+            session.status = UploadSession.STATUS_ABORTED
+            session.save(update_fields=['status', 'updated_at'])
+    _remove_part(session)
+    return session
+
+
+def _remove_part(session):
+    try:
+        os.remove(session.part_path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired_uploads() -> int:
+    """Delete expired unfinished sessions and their partial files. Returns the number removed."""
+    expired = list(UploadSession.objects.filter(status=UploadSession.STATUS_UPLOADING, expires_at__lt=now()))
+    for session in expired:
+        _remove_part(session)
+    UploadSession.objects.filter(pk__in=[s.pk for s in expired]).delete()
+    return len(expired)
@@ -0,0 +1,143 @@
+"""
+Document delivery once a view has authorized the request.
+
+``settings.DOCUMENT_SERVE_MODE`` picks how the bytes leave the server:
+
+- ``'nginx'``: an empty response with ``X-Accel-Redirect: <DOCUMENT_ACCEL_REDIRECT_PREFIX><name>``,
+  the name percent-encoded; nginx serves the file from an ``internal`` location (and handles Range
+  itself).
+- ``'sendfile'``: ``X-Sendfile: <absolute path>`` for Apache mod_xsendfile / lighttpd. A path that
+  is not printable ASCII cannot be sent in the header and is served as in ``'django'`` mode.
+- ``'django'`` (default): Django answers ``Range`` / ``If-Range`` with 206 and a single byte range.
+  The body is a FileResponse positioned at the range start with an exact Content-Length, so
+  servers whose ``wsgi.file_wrapper`` uses ``os.sendfile`` (gunicorn) send it from the kernel;
+  others read it in bounded blocks.
+"""
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from .storage import is_blob
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of ``fh`` starting at ``start`` that keeps ``fileno()``."""
+
+    def __init__(self, fh, start: int, length: int):
+        fh.seek(start)
+        self._fh = fh
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._fh.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def close(self):
+        self._fh.close()
+
+
+def file_etag(fieldfile) -> str:
+    name = fieldfile.name
+    if is_blob(name):
+        # Content-addressed names embed the SHA-256, so they are exact validators
+        return quote_etag(name.rsplit('/', 1)[-1].split('.')[0])
+    storage = fieldfile.storage
+    return quote_etag(f"{storage.size(name):x}-{int(storage.get_modified_time(name).timestamp()):x}")
+
+
+def parse_range(header: str, size: int):
+    """Return (start, end) inclusive for a single satisfiable byte range, None to ignore the header,
+    or False when the range cannot be satisfied."""
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None  # absent, malformed or multi-range: serve the whole file
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag: str, last_modified: str) -> bool:
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    value = value.strip()
+    return value == etag if value.startswith('"') else value == last_modified
+
+
+def _accelerated(fieldfile, mode):
+    """Response handing the file to the front server, or None when its path cannot be put in a header."""
+    response = HttpResponse()
+    if mode == 'nginx':
+        # nginx unescapes the X-Accel-Redirect URI, so spaces, '%', '?' and non-ASCII are percent-encoded
+        prefix = getattr(settings, 'DOCUMENT_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(fieldfile.name)
+    else:
+        # X-Sendfile takes the raw filesystem path, which a header can only carry as printable ASCII
+        path = fieldfile.path
+        if not path.isascii() or not path.isprintable():
+            return None
+        response['X-Sendfile'] = path
+    # Let the front server pick the type from the headers set below
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, fieldfile, *, content_type: str = '', filename: str = '', as_attachment: bool = False):
+    """Response delivering ``fieldfile``; raises FileNotFoundError when it is missing from storage."""
+    mode = getattr(settings, 'DOCUMENT_SERVE_MODE', 'django')
+    response = _accelerated(fieldfile, mode) if mode in ('nginx', 'sendfile') else None
+    if response is None:
+        storage = fieldfile.storage
+        size = storage.size(fieldfile.name)
+        etag = file_etag(fieldfile)
+        last_modified = http_date(storage.get_modified_time(fieldfile.name).timestamp())
+
+        byte_range = None
+        if request.headers.get('Range') and _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(request.headers['Range'], size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        fh = storage.open(fieldfile.name, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(FileRange(fh, start, end - start + 1), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(fh)
+            response['Content-Length'] = str(size)
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+
+    if content_type:
+        response['Content-Type'] = content_type
+    if filename:
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Cache-Control'] = 'private'
+    return response
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete
+
+from .storage import is_blob
+
+
+def release_document_blob(sender, instance, **kwargs):
+    name = instance.file.name if instance.file else ''
+    if is_blob(name):
+        instance.file.storage.delete(name)
+
+
+def connect_document_blob_release():
+    from bids.models import BidDocument
+    from tenders.models import TenderDocument
+    for model in (BidDocument, TenderDocument):
+        post_delete.connect(release_document_blob, sender=model,
+                            dispatch_uid=f'release_blob_{model._meta.label_lower}')
@@ -0,0 +1,174 @@
+"""
+Content-addressed storage for bid and tender documents.
+
+Files are hashed while they stream in and kept once per (SHA-256, extension) under
+``blobs/<aa>/<bb>/<sha256><ext>``, whatever name ``upload_to`` proposed. A StoredBlob row tracks
+each blob's references:
+
+- every save adds one (a duplicate upload only bumps the counter and drops its temp file);
+- ``add_reference`` re-attaches an existing blob to another document without touching the bytes;
+- ``delete`` (also called when a document row is deleted, see uploads.signals) releases one.
+
+Unreferenced blobs are removed by ``collect_garbage`` after a grace period, so a save racing a
+release never loses its file. ``reconcile_references`` recounts from the document tables to undo
+drift from raw SQL or rolled-back transactions.
+"""
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.deconstruct import deconstructible
+from django.utils.timezone import now
+
+BLOB_PREFIX = 'blobs/'
+DEFAULT_GC_GRACE_HOURS = 24
+
+
+def blob_name(digest: str, ext: str = '') -> str:
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def is_blob(name: str) -> bool:
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def _extension(name: str) -> str:
+    ext = os.path.splitext(name or '')[1].lower()
+    return ext if len(ext) <= 10 and ext[1:].isalnum() else ''
+
+
+def _document_models():
+    from bids.models import BidDocument
+    from tenders.models import TenderDocument
+    return BidDocument, TenderDocument
+
+
+def _document_references(name: str) -> int:
+    return sum(model.objects.filter(file=name).count() for model in _document_models())
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def _blob_model(self):
+        from .models import StoredBlob
+        return StoredBlob
+
+    def _temp_dir(self) -> str:
+        path = self.path(f'{BLOB_PREFIX}tmp')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _save(self, name, content):
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._temp_dir())
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            return self.adopt(tmp_path, hasher.hexdigest(), size, original_name=name)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def adopt(self, path: str, digest: str, size: int, original_name: str = '') -> str:
+        """Move the local file at ``path`` (whose SHA-256 is ``digest``) into the store and add a reference."""
+        Blob = self._blob_model()
+        name = blob_name(digest, _extension(original_name))
+        with transaction.atomic():
+            blob, _ = Blob.objects.select_for_update().get_or_create(
+                name=name, defaults={'sha256': digest, 'size': size})
+            target = self.path(name)
+            if os.path.exists(target):
+                os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                if self.file_permissions_mode is not None:
+                    os.chmod(target, self.file_permissions_mode)
+            Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, last_referenced_at=now())
+        return name
+
+    def add_reference(self, name: str) -> str:
+        """Reference an existing blob once more; returns ``name`` for the new document's file field."""
+        with transaction.atomic():
+            updated = self._blob_model().objects.filter(name=name).update(
+                ref_count=F('ref_count') + 1, last_referenced_at=now())
+            if not updated or not self.exists(name):
+                raise FileNotFoundError(name)
+        return name
+
+    def delete(self, name):
+        if not is_blob(name):
+            return super().delete(name)
+        # Release only; the bytes go when collect_garbage finds no references left
+        self._blob_model().objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, last_referenced_at=now())
+
+    def collect_garbage(self, grace: timedelta = None) -> int:
+        """Delete blobs unreferenced for longer than ``grace`` and stray files with no StoredBlob row."""
+        Blob = self._blob_model()
+        grace = grace if grace is not None else timedelta(
+            hours=getattr(settings, 'DOCUMENT_BLOB_GC_GRACE_HOURS', DEFAULT_GC_GRACE_HOURS))
+        cutoff = now() - grace
+        removed = 0
+        candidates = Blob.objects.filter(ref_count__lte=0, last_referenced_at__lt=cutoff)
+        for pk in list(candidates.values_list('pk', flat=True)):
+            with transaction.atomic():
+                blob = Blob.objects.select_for_update().filter(pk=pk, ref_count__lte=0).first()
+                if blob is None:
+                    continue
+                # The counter can lag a document row (see reconcile_references); never drop a referenced file
+                refs = _document_references(blob.name)
+                if refs:
+                    Blob.objects.filter(pk=pk).update(ref_count=refs, last_referenced_at=now())
+                    continue
+                super().delete(blob.name)
+                blob.delete()
+                removed += 1
+
+        # Files left by crashed saves or rolled-back transactions
+        root = self.path(BLOB_PREFIX.rstrip('/'))
+        for dirpath, _, files in os.walk(root):
+            for filename in files:
+                full = os.path.join(dirpath, filename)
+                name = os.path.relpath(full, self.location).replace(os.sep, '/')
+                if os.path.getmtime(full) >= cutoff.timestamp():
+                    continue
+                if name.startswith(f'{BLOB_PREFIX}tmp/') or not Blob.objects.filter(name=name).exists():
+                    os.remove(full)
+                    removed += 1
+        return removed
+
+    def reconcile_references(self) -> int:
+        """Recount references from BidDocument/TenderDocument rows. Returns the number of blobs corrected."""
+        Blob = self._blob_model()
+        actual = {}
+        for model in _document_models():
+            rows = (model.objects.filter(file__startswith=BLOB_PREFIX).order_by()
+                    .values('file').annotate(n=Count('pk')).values_list('file', 'n'))
+            for name, n in rows:
+                actual[name] = actual.get(name, 0) + n
+        corrected = 0
+        for blob in Blob.objects.all().iterator():
+            refs = actual.get(blob.name, 0)
+            if blob.ref_count != refs:
+                Blob.objects.filter(pk=blob.pk).update(ref_count=refs, last_referenced_at=now())
+                corrected += 1
+        return corrected
+
+
+document_storage = ContentAddressedStorage()
+
+
+def get_document_storage():
+    return document_storage
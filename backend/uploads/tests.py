@@ -0,0 +1,193 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from bids.models import Bid, BidDocument
+from tenders.models import Category, Tender, TenderUploadDocuments
+from users.models import ProcuringEntity, User
+
+from .models import UploadSession
+from .serving import serve_file
+from .services import purge_expired_uploads
+
+CHUNK_SIZE = 1024
+
+
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_superuser(email='admin@example.com', password='x', username='admin',
+                                              user_type='admin')
+        cls.supplier = User.objects.create_user(email='supplier@example.com', password='x', username='supplier',
+                                                user_type='supplier')
+        entity = ProcuringEntity.objects.create(name='Ministry of Health', code='MOH', entity_type='ministry')
+        category = Category.objects.create(name='Medical Supplies', code='MED')
+        tender = Tender.objects.create(
+            reference_number='MOH-2026-001', title='Supply of surgical gloves', description='Gloves',
+            category=category, procuring_entity=entity, procurement_method='open_domestic',
+            closing_date=now() + timedelta(days=7), status='published', created_by=admin,
+        )
+        TenderUploadDocuments.objects.create(tender=tender, name='Technical Proposal', file_type='technical_proposal',
+                                             max_file_size=10 * 1024 * 1024, mandatory=True)
+        cls.bid = Bid.objects.create(tender=tender, supplier=cls.supplier, total_bid_amount=1000, bid_validity_days=90)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root, CHUNKED_UPLOAD_DIR=os.path.join(self.media_root, '.chunked'),
+                                  CHUNKED_UPLOAD_MAX_CHUNK_SIZE=CHUNK_SIZE)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.supplier)
+        self.content = os.urandom(CHUNK_SIZE * 2 + 100)
+
+    def start(self, content=None):
+        content = self.content if content is None else content
+        response = self.client.post('/uploads/', {
+            'target': 'bid_document', 'bid_id': str(self.bid.id), 'filename': 'proposal.pdf',
+            'size': len(content), 'document_type': 'technical_proposal',
+            'checksum': hashlib.sha256(content).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def put_chunk(self, upload_id, offset, chunk, **headers):
+        return self.client.put(f'/uploads/{upload_id}/chunk/?offset={offset}', data=chunk,
+                               content_type='application/octet-stream', **headers)
+
+    def send_all(self, upload_id):
+        for offset in range(0, len(self.content), CHUNK_SIZE):
+            response = self.put_chunk(upload_id, offset, self.content[offset:offset + CHUNK_SIZE])
+            self.assertEqual(response.status_code, 200, response.data)
+
+    def test_chunks_are_assembled_into_the_document(self):
+        upload_id = self.start()
+        self.send_all(upload_id)
+
+        response = self.client.post(f'/uploads/{upload_id}/complete/', {}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        document = BidDocument.objects.get(pk=response.data['document_id'])
+        self.assertEqual(document.bid_id, self.bid.id)
+        self.assertEqual(document.document_type, 'technical_proposal')
+        self.assertTrue(document.is_required)
+        with document.file.open('rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+        self.assertFalse(os.path.exists(UploadSession.objects.get(pk=upload_id).part_path))
+
+        # Completing again returns the same document instead of creating another one
+        again = self.client.post(f'/uploads/{upload_id}/complete/', {}, format='json')
+        self.assertEqual(again.data['document_id'], response.data['document_id'])
+        self.assertEqual(BidDocument.objects.filter(bid=self.bid).count(), 1)
+
+    def test_out_of_order_chunk_is_rejected_with_resume_point(self):
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE])
+
+        response = self.put_chunk(upload_id, CHUNK_SIZE * 2, self.content[CHUNK_SIZE * 2:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['code'], 'offset_mismatch')
+        self.assertEqual(response.data['received_bytes'], CHUNK_SIZE)
+        self.assertEqual(os.path.getsize(UploadSession.objects.get(pk=upload_id).part_path), CHUNK_SIZE)
+
+    def test_duplicate_chunk_does_not_change_the_file(self):
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE])
+
+        response = self.put_chunk(upload_id, 0, os.urandom(CHUNK_SIZE))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['received_bytes'], CHUNK_SIZE)
+
+        # The client resumes from received_bytes and the file still matches
+        for offset in range(CHUNK_SIZE, len(self.content), CHUNK_SIZE):
+            self.put_chunk(upload_id, offset, self.content[offset:offset + CHUNK_SIZE])
+        response = self.client.post(f'/uploads/{upload_id}/complete/', {}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_chunk_with_bad_checksum_is_discarded(self):
+        upload_id = self.start()
+        response = self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE], HTTP_X_CHUNK_CHECKSUM='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'checksum_mismatch')
+        session = UploadSession.objects.get(pk=upload_id)
+        self.assertEqual(session.received_bytes, 0)
+        self.assertEqual(os.path.getsize(session.part_path), 0)
+
+    def test_oversize_chunk_is_rejected(self):
+        upload_id = self.start()
+        response = self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE + 1])
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.path.getsize(UploadSession.objects.get(pk=upload_id).part_path), 0)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE])
+        response = self.client.post(f'/uploads/{upload_id}/complete/', {}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['code'], 'incomplete')
+        self.assertFalse(BidDocument.objects.filter(bid=self.bid).exists())
+
+    def test_abandoned_uploads_are_purged(self):
+        abandoned = self.start()
+        self.put_chunk(abandoned, 0, self.content[:CHUNK_SIZE])
+        active = self.start()
+        UploadSession.objects.filter(pk=abandoned).update(expires_at=now() - timedelta(minutes=1))
+        abandoned_part = UploadSession.objects.get(pk=abandoned).part_path
+
+        self.assertEqual(purge_expired_uploads(), 1)
+        self.assertFalse(UploadSession.objects.filter(pk=abandoned).exists())
+        self.assertFalse(os.path.exists(abandoned_part))
+        self.assertTrue(os.path.exists(UploadSession.objects.get(pk=active).part_path))
+
+    def test_abort_discards_the_partial_file(self):
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, self.content[:CHUNK_SIZE])
+        part_path = UploadSession.objects.get(pk=upload_id).part_path
+
+        response = self.client.delete(f'/uploads/{upload_id}/')
+        self.assertEqual(response.data['status'], UploadSession.STATUS_ABORTED)
+        self.assertFalse(os.path.exists(part_path))
+        self.assertEqual(self.put_chunk(upload_id, CHUNK_SIZE, self.content[CHUNK_SIZE:]).status_code, 409)
+
+
+class AcceleratedServingTests(SimpleTestCase):
+    NAME = 'bids/1/documents/tax clearance 100% ?final ü.pdf'
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage = FileSystemStorage(location=self.media_root)
+        storage.save(self.NAME, ContentFile(b'%PDF-1.4 test'))
+        self.fieldfile = FieldFile(None, BidDocument._meta.get_field('file'), self.NAME)
+        self.fieldfile.storage = storage
+        self.request = RequestFactory().get('/')
+
+    @override_settings(DOCUMENT_SERVE_MODE='nginx', DOCUMENT_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect_is_percent_encoded(self):
+        response = serve_file(self.request, self.fieldfile, filename='tax clearance ü.pdf', as_attachment=True)
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/bids/1/documents/tax%20clearance%20100%25%20%3Ffinal%20%C3%BC.pdf')
+        self.assertEqual(response['Content-Disposition'], "attachment; filename*=utf-8''tax%20clearance%20%C3%BC.pdf")
+
+    @override_settings(DOCUMENT_SERVE_MODE='sendfile')
+    def test_sendfile_falls_back_to_django_for_non_ascii_paths(self):
+        response = serve_file(self.request, self.fieldfile)
+        self.assertNotIn('X-Sendfile', response)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 test')
+
+    @override_settings(DOCUMENT_SERVE_MODE='sendfile')
+    def test_sendfile_keeps_ascii_paths(self):
+        name = 'bids/1/documents/tax clearance.pdf'
+        self.fieldfile.storage.save(name, ContentFile(b'x'))
+        self.fieldfile.name = name
+        response = serve_file(self.request, self.fieldfile)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, name))
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import initiate_upload, upload_detail, upload_chunk, finish_upload
+
+urlpatterns = [
+    path('', initiate_upload, name='upload_initiate'),
+    path('<uuid:upload_id>/', upload_detail, name='upload_detail'),
+    path('<uuid:upload_id>/chunk/', upload_chunk, name='upload_chunk'),
+    path('<uuid:upload_id>/complete/', finish_upload, name='upload_complete'),
+]
@@ -0,0 +1,70 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .services import UploadError, start_upload, get_session, write_chunk, complete_upload, abort_upload, \
+    session_payload
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def initiate_upload(request):
+    """Start a resumable upload.
+
+    Body: target ('bid_document' with bid_id, or 'tender_document' with tender_id), filename, size,
+    content_type, document_type and optionally checksum (SHA-256 hex of the whole file). Tender
+    documents also accept document_name, is_mandatory and version.
+    """
+    try:
+        session = start_upload(request.user, request.data)
+    except UploadError as e:
+        return Response(e.payload, status=e.status)
+    return Response(session_payload(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_detail(request, upload_id):
+    """GET reports progress (resume from received_bytes); DELETE aborts and discards the partial file."""
+    try:
+        if request.method == 'DELETE':
+            session = abort_upload(upload_id, request.user)
+        else:
+            session = get_session(upload_id, request.user)
+    except UploadError as e:
+        return Response(e.payload, status=e.status)
+    return Response(session_payload(session))
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, upload_id):
+    """Append the raw request body at ?offset= (or the Upload-Offset header).
+
+    An optional X-Chunk-Checksum header (SHA-256 hex of the chunk) is verified before the chunk is kept.
+    """
+    raw_offset = request.query_params.get('offset', request.headers.get('Upload-Offset'))
+    try:
+        offset = int(raw_offset)
+    except (TypeError, ValueError):
+        return Response({'error': 'offset is required', 'code': 'invalid'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.stream is None:
+        return Response({'error': 'Empty chunk', 'code': 'empty_chunk'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        session = write_chunk(upload_id, request.user, offset, request.stream,
+                              checksum=request.headers.get('X-Chunk-Checksum'))
+    except UploadError as e:
+        return Response(e.payload, status=e.status)
+    return Response(session_payload(session))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finish_upload(request, upload_id):
+    """Verify the file (optional body checksum overrides the one given at initiation) and attach the document."""
+    try:
+        session = complete_upload(upload_id, request.user, checksum=request.data.get('checksum'))
+    except UploadError as e:
+        return Response(e.payload, status=e.status)
+    return Response(session_payload(session), status=status.HTTP_201_CREATED)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_profileeditrequest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entityuser',
+            index=models.Index(fields=['user', 'status', 'entity'], name='users_entit_user_id_a108a1_idx'),
+        ),
+    ]
@@ -213,6 +213,10 @@ class EntityUser(models.Model):
 
     class Meta:
         unique_together = ['user', 'entity', 'role']
+        indexes = [
+            # Permission checks filter (user, status) with or without entity; equality on all three uses it fully
+            models.Index(fields=['user', 'status', 'entity']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.entity.name} ({self.get_role_display()})"